@@ -0,0 +1,149 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from typing import Dict
+from typing import List
+
+from models.CronExpansion import get_cron_expansion
+
+
+class LabelDemand(object):
+    """Forecasted run demand per time bucket for a single label set."""
+
+    def __init__(self, label_key: str, bucket_count: int, capacity: int):
+        self.label_key = label_key
+        self.capacity = capacity
+        self.flow_groups = 0
+        self.starts = [0] * bucket_count
+        self.concurrent = [0] * bucket_count
+
+    def get_total_runs(self) -> int:
+        return sum(self.starts)
+
+    def get_peak(self) -> int:
+        return max(self.concurrent) if self.concurrent else 0
+
+    def get_peak_bucket(self) -> int:
+        return self.concurrent.index(self.get_peak()) if self.concurrent else 0
+
+    def is_overcommitted(self) -> bool:
+        return bool(self.get_peak() > self.capacity)
+
+
+class CapacityForecast(object):
+    """
+    Forecasts how many runs each label set (and so the agents serving
+    it) receives per time bucket over a horizon, from the cron clocks
+    of the flow groups.
+
+    Flow groups are first reduced to multiplicities per (label set,
+    cron expression, timezone, start and end dates). Each distinct cron
+    and timezone is expanded into a run count per minute once, and added
+    to its label set scaled by the multiplicity within the clock dates,
+    so the cost grows with the distinct schedules and not with the
+    number of flow groups.
+
+    Runs are considered active during ``run_minutes`` after their start.
+    The concurrent demand of a bucket is the highest number of runs
+    active at the same minute within it.
+    """
+
+    NO_LABELS_KEY = "(no labels)"
+
+    def __init__(
+        self,
+        horizon_hours: int = 24,
+        bucket_minutes: int = 15,
+        run_minutes: int = 15,
+        default_capacity: int = 10,
+        capacities: Dict[str, int] = None,
+        start: datetime = None,
+    ):
+        start = (start or datetime.now(timezone.utc)).replace(second=0, microsecond=0)
+        # align the buckets to the clock (e.g. :00, :15, :30, :45)
+        minute_of_day = start.hour * 60 + start.minute
+        self.start = start - timedelta(minutes=minute_of_day % bucket_minutes)
+        self.end = self.start + timedelta(hours=horizon_hours)
+        self.bucket_minutes = bucket_minutes
+        self.run_minutes = run_minutes
+        self.default_capacity = default_capacity
+        self.capacities = capacities or {}
+        self.bucket_count = -(-horizon_hours * 60 // bucket_minutes)
+        self._cron_counts = Counter()  # type: Counter
+        self._zones = {}  # type: Dict[str, object]
+        self._flow_group_counts = Counter()  # type: Counter
+
+    @classmethod
+    def get_label_key(cls, labels: List[str]) -> str:
+        if not labels:
+            return cls.NO_LABELS_KEY
+        return ", ".join(sorted(labels))
+
+    def add_flow_group(self, flow_group):
+        label_key = self.get_label_key(flow_group.labels)
+        self._flow_group_counts[label_key] += 1
+        for clock in flow_group.schedules:
+            # clocks in an unknown timezone add no demand
+            if clock.is_cron() and clock.zone is not None:
+                self._zones[clock.timezone] = clock.zone
+                self._cron_counts[(label_key, clock.value, clock.timezone, clock.start_date, clock.end_date)] += 1
+
+    def get_bucket_start(self, bucket_index: int) -> datetime:
+        return self.start + timedelta(minutes=bucket_index * self.bucket_minutes)
+
+    def compute(self) -> Dict[str, LabelDemand]:
+        demands = {}  # type: Dict[str, LabelDemand]
+        for label_key, flow_group_count in self._flow_group_counts.items():
+            demands[label_key] = LabelDemand(
+                label_key=label_key,
+                bucket_count=self.bucket_count,
+                capacity=self.capacities.get(label_key, self.default_capacity),
+            )
+            demands[label_key].flow_groups = flow_group_count
+
+        # starts are expanded per minute, from early enough to count the
+        # runs started before the horizon that are still running on it
+        run_minutes = max(1, self.run_minutes)
+        lead_minutes = run_minutes - 1
+        expansion_start = self.start - timedelta(minutes=lead_minutes)
+
+        minute_count = int((self.end - expansion_start).total_seconds() // 60)
+        cron_starts = {}  # type: Dict[tuple, List[int]]
+        minute_starts_by_label = {}  # type: Dict[str, List[int]]
+        for cron_key, multiplicity in self._cron_counts.items():
+            label_key, cron_value, timezone_name, start_date, end_date = cron_key
+            if (cron_value, timezone_name) not in cron_starts:
+                cron_starts[(cron_value, timezone_name)] = get_cron_expansion(cron_value).count_per_bucket(
+                    expansion_start, self.end, 1, self._zones[timezone_name]
+                )
+
+            # only the starts within the clock dates (both included)
+            first_minute, last_minute = 0, minute_count - 1
+            if start_date is not None:
+                first_minute = max(first_minute, -(-(start_date - expansion_start) // timedelta(minutes=1)))
+            if end_date is not None:
+                last_minute = min(last_minute, (end_date - expansion_start) // timedelta(minutes=1))
+
+            minute_starts = minute_starts_by_label.setdefault(label_key, [0] * minute_count)
+            counts = cron_starts[(cron_value, timezone_name)]
+            for minute_index in range(first_minute, last_minute + 1):
+                if counts[minute_index]:
+                    minute_starts[minute_index] += counts[minute_index] * multiplicity
+
+        # concurrent runs: sliding sum of the starts within the run
+        # duration at each minute, the peak of a bucket is its max
+        for label_key, minute_starts in minute_starts_by_label.items():
+            demand = demands[label_key]
+            window_sum = 0
+            for minute_index, starts in enumerate(minute_starts):
+                window_sum += starts
+                if minute_index >= run_minutes:
+                    window_sum -= minute_starts[minute_index - run_minutes]
+                minute_offset = minute_index - lead_minutes
+                if minute_offset < 0:
+                    continue
+                bucket_index = minute_offset // self.bucket_minutes
+                demand.starts[bucket_index] += starts
+                demand.concurrent[bucket_index] = max(demand.concurrent[bucket_index], window_sum)
+
+        return demands
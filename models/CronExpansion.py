@@ -0,0 +1,191 @@
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from itertools import islice
+
+from typing import List
+
+from cron_converter import Cron
+
+
+class CronExpansion(object):
+    """
+    Cron expression expanded into the set of values of each field.
+
+    Fire times are computed arithmetically from the expanded sets
+    (matching days times the minutes of the day) instead of seeking the
+    schedule one run at a time. Day of month and day of week follow the
+    rule of croniter (used by Prefect to schedule the runs): when both
+    are restricted, a day matching any of them fires. A day field
+    expanded to all its values is only unrestricted when the other day
+    field contains a ``*`` (``0 0 1-31 * 1`` fires every day, while
+    ``0 0 * * 1`` and ``0 0 1-31 * */2`` only fire on their weekdays).
+
+    Equivalent expressions (e.g. ``0 */2 * * *`` and ``0 0,2,4,...,22 * * *``)
+    share the same ``canonical_key`` and ``canonical_value``. This class
+    is the single cron evaluator of the reports: next runs, expected
+    runs and forecasts are all computed from it.
+
+    Expressions are evaluated in UTC unless a zone is given (Prefect
+    evaluates a clock in the timezone of its start date). Local times
+    skipped by a DST transition fire as the UTC instant the wall clock
+    jumps over (02:30 fires at the same instant as 03:30), and repeated
+    local times fire once, on their first occurrence.
+    """
+
+    MINUTES_PER_DAY = 24 * 60
+
+    # long enough to reach any valid expression (e.g. 29th of february on mondays)
+    MAX_SEEK_DAYS = 366 * 28
+
+    def __init__(self, cron_value: str):
+        cron = Cron(cron_value)
+        minutes, hours, days, months, weekdays = cron.to_list()
+        self.value = cron_value
+        self.minutes = tuple(minutes)
+        self.hours = tuple(hours)
+        self.days = frozenset(days)
+        self.months = frozenset(months)
+        self.weekdays = frozenset(weekdays)
+
+        day_field, weekday_field = cron_value.split()[2:5:2]
+        self.is_day_restricted, self.is_weekday_restricted = self.get_day_restrictions(
+            day_field, weekday_field, self.days, self.weekdays
+        )
+        self.canonical_key = (
+            tuple(minutes), tuple(hours), tuple(days), tuple(months), tuple(weekdays),
+            self.is_day_restricted, self.is_weekday_restricted,
+        )
+
+        # the canonical string is only used when it keeps the day rule
+        # (e.g. ``1-31`` is written as ``*``)
+        canonical_value = cron.to_string()
+        canonical_day_field, canonical_weekday_field = canonical_value.split()[2:5:2]
+        canonical_restrictions = self.get_day_restrictions(
+            canonical_day_field, canonical_weekday_field, self.days, self.weekdays
+        )
+        if canonical_restrictions == (self.is_day_restricted, self.is_weekday_restricted):
+            self.canonical_value = canonical_value
+        else:
+            self.canonical_value = " ".join(cron_value.split())
+        self.minutes_of_day = tuple(
+            sorted(hour * 60 + minute for hour in self.hours for minute in self.minutes)
+        )
+
+    @staticmethod
+    def get_day_restrictions(day_field: str, weekday_field: str, days, weekdays):
+        """Whether day of month and day of week are restricted, as croniter decides it."""
+        is_day_restricted = not (
+            day_field == "*" or (len(days) == 31 and "*" in weekday_field)
+        )
+        is_weekday_restricted = not (
+            weekday_field == "*" or (len(weekdays) == 7 and "*" in day_field)
+        )
+        return is_day_restricted, is_weekday_restricted
+
+    def matches_date(self, date) -> bool:
+        if date.month not in self.months:
+            return False
+        # cron weekdays go from 0 (sunday) to 6 (saturday)
+        day_matches = date.day in self.days
+        weekday_matches = date.isoweekday() % 7 in self.weekdays
+        if self.is_day_restricted and self.is_weekday_restricted:
+            return day_matches or weekday_matches
+        return day_matches and weekday_matches
+
+    def iter_fire_times(self, start: datetime, end: datetime):
+        """Fire times in [start, end), with the same tzinfo as start (UTC expected)."""
+        day_start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        while day_start < end:
+            if self.matches_date(day_start):
+                for minute_of_day in self.minutes_of_day:
+                    fire_time = day_start + timedelta(minutes=minute_of_day)
+                    if fire_time >= end:
+                        break
+                    if fire_time >= start:
+                        yield fire_time
+            day_start += timedelta(days=1)
+
+    def iter_fire_times_in_zone(self, start: datetime, end: datetime, zone=None):
+        """Fire times in [start, end) of the expression evaluated in ``zone``, as UTC datetimes."""
+        start = start.astimezone(timezone.utc)
+        end = end.astimezone(timezone.utc)
+        if zone is None or zone is timezone.utc:
+            yield from self.iter_fire_times(start, end)
+            return
+
+        local_day = start.astimezone(zone).date()
+        last_local_day = end.astimezone(zone).date()
+        while local_day <= last_local_day:
+            if self.matches_date(local_day):
+                # wall times are resolved with fold=0: skipped ones land
+                # after the jump and repeated ones on their first instant,
+                # so the day is sorted and de-duplicated
+                day_fire_times = sorted({
+                    datetime(
+                        local_day.year, local_day.month, local_day.day,
+                        minute_of_day // 60, minute_of_day % 60, tzinfo=zone,
+                    ).astimezone(timezone.utc)
+                    for minute_of_day in self.minutes_of_day
+                })
+                for fire_time in day_fire_times:
+                    if fire_time >= end:
+                        return
+                    if fire_time >= start:
+                        yield fire_time
+            local_day += timedelta(days=1)
+
+    def get_next_fire_times(
+        self,
+        start: datetime,
+        count: int,
+        zone=None,
+        start_date: datetime = None,
+        end_date: datetime = None,
+    ) -> List[datetime]:
+        """
+        Next ``count`` fire times strictly after start, bounded by the
+        start and end dates (both included) of the clock, if any.
+        """
+        if start_date is not None and start_date - timedelta(minutes=1) > start:
+            start = start_date - timedelta(minutes=1)
+        start = start.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        end = start + timedelta(days=self.MAX_SEEK_DAYS)
+        if end_date is not None:
+            end = min(end, end_date + timedelta(microseconds=1))
+        fire_times = (
+            fire_time for fire_time in self.iter_fire_times_in_zone(start, end, zone)
+            if start_date is None or fire_time >= start_date
+        )
+        return list(islice(fire_times, count))
+
+    def count_per_bucket(self, start: datetime, end: datetime, bucket_minutes: int, zone=None) -> List[int]:
+        """Number of fire times in each bucket of ``bucket_minutes`` from start to end."""
+        horizon_minutes = int((end - start).total_seconds() // 60)
+        bucket_count = -(-horizon_minutes // bucket_minutes)
+        counts = [0] * bucket_count
+
+        if zone is not None and zone is not timezone.utc:
+            for fire_time in self.iter_fire_times_in_zone(start, end, zone):
+                minute_offset = int((fire_time - start).total_seconds() // 60)
+                counts[minute_offset // bucket_minutes] += 1
+            return counts
+
+        start_offset = start.hour * 60 + start.minute
+        day_start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        day_offset = -start_offset
+        while day_offset < horizon_minutes:
+            if self.matches_date(day_start):
+                for minute_of_day in self.minutes_of_day:
+                    minute_offset = day_offset + minute_of_day
+                    if minute_offset >= horizon_minutes:
+                        break
+                    if minute_offset >= 0:
+                        counts[minute_offset // bucket_minutes] += 1
+            day_start += timedelta(days=1)
+            day_offset += self.MINUTES_PER_DAY
+        return counts
+
+
+@lru_cache(maxsize=None)
+def get_cron_expansion(cron_value: str) -> CronExpansion:
+    return CronExpansion(cron_value)
@@ -0,0 +1,196 @@
+from typing import Dict
+from typing import List
+
+
+class FetchPlan(object):
+    """
+    Strategy selected to fetch flow groups for a report, together with
+    the probe counts and the payload estimation it was selected from.
+    """
+
+    STRATEGY_SINGLE = "single"
+    STRATEGY_LATEST_ONLY = "latest-only"
+    STRATEGY_SHARDED = "sharded"
+    STRATEGY_PAGINATED = "paginated"
+
+    def __init__(
+        self,
+        strategy: str,
+        project_filters: List[str],
+        project_names: List[str],
+        flow_group_count: int,
+        flow_count: int,
+        estimated_bytes: int,
+        latest_only: bool = False,
+        page_size: int = None,
+        max_workers: int = 1,
+        schedule_only: bool = False,
+        project_counts: Dict[str, int] = None,
+    ):
+        self.strategy = strategy
+        self.project_filters = project_filters
+        self.project_names = project_names
+        self.flow_group_count = flow_group_count
+        self.flow_count = flow_count
+        self.estimated_bytes = estimated_bytes
+        self.latest_only = latest_only
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.schedule_only = schedule_only
+        # flow groups expected on each project, used to plan the pages
+        self.project_counts = project_counts or {}
+
+    def is_per_project(self):
+        return bool(self.strategy in (self.STRATEGY_SHARDED, self.STRATEGY_PAGINATED))
+
+    def explain(self) -> str:
+        filters_as_str = ", ".join(self.project_filters) if self.project_filters else "(none)"
+        lines = [
+            f"Fetch plan: {self.strategy}",
+            f"|- project filters:      {filters_as_str}",
+            f"|- projects matched:     {len(self.project_names)}",
+            f"|- flow groups:          {self.flow_group_count}",
+            f"|- flow versions:        {self.flow_count}",
+            f"|- estimated payload:    {self.estimated_bytes / 1024:.1f} KiB",
+            f"|- latest version only:  {'YES' if self.latest_only else 'NO'}",
+            f"|- schedule active only: {'YES' if self.schedule_only else 'NO'}",
+            f"|- page size:            {self.page_size if self.page_size else '-'}",
+            f"|- concurrent workers:   {self.max_workers}",
+        ]
+        return "\n".join(lines)
+
+    def __str__(self):
+        return (
+            f"strategy={self.strategy} projects={len(self.project_names)} "
+            f"flow_groups={self.flow_group_count} flows={self.flow_count} "
+            f"estimated_bytes={self.estimated_bytes} latest_only={self.latest_only} "
+            f"schedule_only={self.schedule_only} "
+            f"page_size={self.page_size} max_workers={self.max_workers}"
+        )
+
+
+class FetchPlanner(object):
+    """
+    Selects how flow groups should be fetched from the counts returned
+    by the aggregate probes (see ``PrefectCloudApiModel.query_summary``).
+
+    The payload estimation is based on the average size of a serialized
+    flow group (name, id, labels and schedule) and of each flow version
+    nested into it. A query is kept as a single request while its
+    estimation fits into ``max_query_bytes``.
+
+    Schedule-only plans are estimated from the schedule-active counts,
+    assuming their flow groups hold the average number of versions of
+    their project.
+    """
+
+    # approximate serialized sizes (in bytes) of the queried fields
+    FLOW_GROUP_BYTES = 640
+    FLOW_BYTES = 230
+
+    MAX_QUERY_BYTES = 4 * 1024 * 1024
+    MAX_WORKERS = 8
+
+    def __init__(self, max_query_bytes: int = MAX_QUERY_BYTES, max_workers: int = MAX_WORKERS):
+        self.max_query_bytes = max_query_bytes
+        self.max_workers = max_workers
+
+    def estimate_bytes(self, flow_group_count: int, flow_count: int, latest_only: bool = False) -> int:
+        if latest_only:
+            flow_count = flow_group_count
+        return flow_group_count * self.FLOW_GROUP_BYTES + flow_count * self.FLOW_BYTES
+
+    def plan(
+        self,
+        summary: Dict[str, Dict[str, int]],
+        project_filters: List[str] = None,
+        schedule_only: bool = False,
+        only_latest: bool = False,
+    ) -> FetchPlan:
+        if project_filters is None:
+            project_filters = []
+
+        count_field = "schedule_active" if schedule_only else "flow_groups"
+        project_names = list(summary.keys())
+        project_counts = {}  # type: Dict[str, int]
+        project_flow_counts = {}  # type: Dict[str, int]
+        for project_name, counts in summary.items():
+            project_counts[project_name] = counts.get(count_field, 0)
+            project_flow_count = counts.get("flows", 0)
+            if schedule_only and counts.get("flow_groups"):
+                project_flow_count = project_flow_count * project_counts[project_name] // counts["flow_groups"]
+            project_flow_counts[project_name] = project_flow_count
+        flow_group_count = sum(project_counts.values())
+        flow_count = sum(project_flow_counts.values())
+
+        full_bytes = self.estimate_bytes(flow_group_count, flow_count)
+        latest_bytes = self.estimate_bytes(flow_group_count, flow_count, latest_only=True)
+
+        plan_args = dict(
+            project_filters=project_filters,
+            project_names=project_names,
+            flow_group_count=flow_group_count,
+            flow_count=flow_count,
+            schedule_only=schedule_only,
+            project_counts=project_counts,
+        )
+
+        if full_bytes <= self.max_query_bytes and not only_latest:
+            return FetchPlan(
+                strategy=FetchPlan.STRATEGY_SINGLE,
+                estimated_bytes=full_bytes,
+                **plan_args
+            )
+
+        if latest_bytes <= self.max_query_bytes and only_latest:
+            return FetchPlan(
+                strategy=FetchPlan.STRATEGY_LATEST_ONLY,
+                estimated_bytes=latest_bytes,
+                latest_only=True,
+                **plan_args
+            )
+
+        # from here on the flow groups are fetched per project, keeping
+        # the version projection requested: every flow version unless
+        # only the latest one is needed.
+        estimated_bytes = latest_bytes if only_latest else full_bytes
+        versions_per_flow_group = 1
+        if not only_latest and flow_group_count:
+            versions_per_flow_group = max(1, -(-flow_count // flow_group_count))
+        page_size = max(1, self.max_query_bytes // self.estimate_bytes(1, versions_per_flow_group))
+
+        largest_shard_bytes = max(
+            self.estimate_bytes(project_counts[project_name], project_flow_counts[project_name], only_latest)
+            for project_name in project_names
+        )
+
+        # the pages of every shard are known from the probe counts, so
+        # they can be requested concurrently too
+        if len(project_names) > 1:
+            if largest_shard_bytes <= self.max_query_bytes:
+                page_size = None
+            return FetchPlan(
+                strategy=FetchPlan.STRATEGY_SHARDED,
+                estimated_bytes=estimated_bytes,
+                latest_only=only_latest,
+                page_size=page_size,
+                max_workers=self.get_max_workers(project_counts, page_size),
+                **plan_args
+            )
+
+        return FetchPlan(
+            strategy=FetchPlan.STRATEGY_PAGINATED,
+            estimated_bytes=estimated_bytes,
+            latest_only=only_latest,
+            page_size=page_size,
+            max_workers=self.get_max_workers(project_counts, page_size),
+            **plan_args
+        )
+
+    def get_max_workers(self, project_counts: Dict[str, int], page_size: int = None) -> int:
+        page_count = 0
+        for project_count in project_counts.values():
+            if not project_count:
+                continue
+            page_count += -(-project_count // page_size) if page_size else 1
+        return max(1, min(self.max_workers, page_count))
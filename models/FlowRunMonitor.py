@@ -0,0 +1,130 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from typing import Dict
+from typing import List
+
+from models.CronExpansion import get_cron_expansion
+
+
+class FlowRunStatus(object):
+    """
+    Compact result of the flow run checks for a single flow group.
+    Only counters and a few sample datetimes are kept, so the statuses
+    of thousands of flow groups can be held without keeping the runs.
+    """
+
+    MAX_SAMPLES = 3
+
+    def __init__(self, flow_group):
+        self.flow_group_id = flow_group.id
+        self.flow_name = flow_group.get_latest_flow().get_versioned_name()
+        self.project_name = flow_group.project.name
+        self.upcoming_runs = 0
+        self.late_runs = 0
+        self.missing_runs = 0
+        self.unchecked_clocks = 0
+        self.late_samples = []  # type: List[datetime]
+        self.missing_samples = []  # type: List[datetime]
+
+    def add_late_run(self, scheduled_start_time: datetime):
+        self.late_runs += 1
+        if len(self.late_samples) < self.MAX_SAMPLES:
+            self.late_samples.append(scheduled_start_time)
+
+    def add_missing_runs(self, expected_time: datetime, count: int):
+        self.missing_runs += count
+        if len(self.missing_samples) < self.MAX_SAMPLES:
+            self.missing_samples.append(expected_time)
+
+    def is_flagged(self):
+        return bool(self.late_runs or self.missing_runs)
+
+
+class FlowRunMonitor(object):
+    """
+    Checks the flow runs of a time window against the cron clocks of
+    their flow groups.
+
+    The window goes from ``lookback_hours`` in the past to
+    ``lookahead_hours`` in the future. A run still ``Scheduled`` after
+    its scheduled start time plus ``late_grace_minutes`` is late, and an
+    expected cron time in the past part of the window without a run
+    scheduled at the same minute is missing.
+
+    Expected cron times are evaluated in the timezone of each clock and
+    bounded by its start and end dates. Clocks in an unknown timezone
+    are not checked for missing runs (counted as ``unchecked_clocks``).
+    """
+
+    STATE_SCHEDULED = "Scheduled"
+
+    def __init__(
+        self,
+        lookback_hours: int = 24,
+        lookahead_hours: int = 6,
+        late_grace_minutes: int = 5,
+        now: datetime = None,
+    ):
+        now = now or datetime.now(timezone.utc)
+        self.now = now.replace(second=0, microsecond=0)
+        self.window_start = self.now - timedelta(hours=lookback_hours)
+        self.window_end = self.now + timedelta(hours=lookahead_hours)
+        self.late_threshold = self.now - timedelta(minutes=late_grace_minutes)
+        self._expected_times_cache = {}  # type: Dict[tuple, List[datetime]]
+
+    def get_expected_run_times(self, cron_value: str, zone=timezone.utc) -> List[datetime]:
+        """Cron times (UTC) between the window start and the late threshold, evaluated in ``zone``."""
+        cache_key = (cron_value, zone)
+        if cache_key not in self._expected_times_cache:
+            cron_expansion = get_cron_expansion(cron_value)
+            self._expected_times_cache[cache_key] = list(
+                cron_expansion.iter_fire_times_in_zone(self.window_start, self.late_threshold, zone)
+            )
+        return self._expected_times_cache[cache_key]
+
+    def evaluate(self, flow_group, flow_runs: List[Dict]) -> FlowRunStatus:
+        status = FlowRunStatus(flow_group)
+
+        observed_minutes = Counter()
+        for flow_run in flow_runs:
+            scheduled_start_time = self.parse_datetime(flow_run.get("scheduled_start_time"))
+            observed_minutes[scheduled_start_time.replace(second=0, microsecond=0)] += 1
+
+            if flow_run.get("state") != self.STATE_SCHEDULED:
+                continue
+            if scheduled_start_time < self.late_threshold:
+                status.add_late_run(scheduled_start_time)
+            elif scheduled_start_time >= self.now:
+                status.upcoming_runs += 1
+
+        expected_minutes = Counter()
+        for clock in flow_group.schedules:
+            if not clock.is_cron():
+                continue
+            if clock.zone is None:
+                status.unchecked_clocks += 1
+                continue
+            expected_minutes.update(
+                expected_time for expected_time in self.get_expected_run_times(clock.value, clock.zone)
+                if (clock.start_date is None or expected_time >= clock.start_date)
+                and (clock.end_date is None or expected_time <= clock.end_date)
+            )
+
+        for expected_time in sorted(expected_minutes):
+            missing_count = expected_minutes[expected_time] - observed_minutes[expected_time]
+            if missing_count > 0:
+                status.add_missing_runs(expected_time, missing_count)
+
+        return status
+
+    @staticmethod
+    def parse_datetime(value: str) -> datetime:
+        parsed_datetime = datetime.fromisoformat(value)
+        if parsed_datetime.tzinfo is None:
+            parsed_datetime = parsed_datetime.replace(tzinfo=timezone.utc)
+        return parsed_datetime.astimezone(timezone.utc)
+
+    @staticmethod
+    def format_datetime(value: datetime) -> str:
+        return value.strftime("%Y-%m-%dT%H:%M:%S+00:00")
@@ -0,0 +1,195 @@
+import abc
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from typing import Dict
+from typing import List
+
+
+class CassetteMissError(KeyError):
+    pass
+
+
+class GraphQlTransport(abc.ABC):
+    """
+    Sends GraphQL queries and returns their responses as plain dicts.
+    Every transport keeps the count and the accumulated latency of the
+    requests sent through it.
+    """
+
+    def __init__(self):
+        self.request_count = 0
+        self.total_latency = 0.0
+        self._stats_lock = threading.Lock()
+
+    def execute(self, query: str, variables: Dict = None) -> Dict:
+        start = time.perf_counter()
+        response = self._execute(str(query), variables)
+        latency = time.perf_counter() - start
+        with self._stats_lock:
+            self.request_count += 1
+            self.total_latency += latency
+        return response
+
+    @abc.abstractmethod
+    def _execute(self, query: str, variables: Dict = None) -> Dict:
+        """Sends a single request. Implemented by every transport."""
+
+    @property
+    def client(self):
+        """The ``prefect.Client`` requests end up on, if any."""
+        return None
+
+    def close(self):
+        pass
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        return " ".join(str(query).split())
+
+    @classmethod
+    def get_request_key(cls, query: str, variables: Dict = None) -> str:
+        request = json.dumps(
+            {"query": cls.normalize_query(query), "variables": variables or {}},
+            sort_keys=True,
+        )
+        return hashlib.sha256(request.encode("utf-8")).hexdigest()
+
+
+class PrefectClientTransport(GraphQlTransport):
+    """Live transport: queries go to Prefect Cloud through ``prefect.Client``."""
+
+    def __init__(self, api_key: str = None, tenant_id: str = None):
+        super().__init__()
+        self.api_key = api_key
+        self.tenant_id = tenant_id
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            import prefect
+            if self.api_key and self.tenant_id:
+                self._client = prefect.Client(api_key=self.api_key, tenant_id=self.tenant_id)
+            else:
+                self._client = prefect.Client()
+        return self._client
+
+    def _execute(self, query: str, variables: Dict = None) -> Dict:
+        from prefect.utilities.collections import as_nested_dict
+        response = self.client.graphql(query, variables=variables)
+        return as_nested_dict(response, dict)
+
+
+class RecordingTransport(GraphQlTransport):
+    """
+    Forwards queries to another transport and records each request and
+    response pair, with its latency, into a gzip compressed cassette.
+    Interactions are keyed by the normalized query plus its variables.
+    The cassette is written on ``close``, together with the given
+    ``metadata`` (e.g. the time the reports were computed for).
+    """
+
+    CASSETTE_VERSION = 1
+
+    def __init__(self, transport: GraphQlTransport, cassette_path: str, metadata: Dict = None):
+        super().__init__()
+        self.transport = transport
+        self.cassette_path = cassette_path
+        self.metadata = metadata or {}
+        self.interactions = {}  # type: Dict[str, Dict]
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        return self.transport.client
+
+    def _execute(self, query: str, variables: Dict = None) -> Dict:
+        start = time.perf_counter()
+        response = self.transport.execute(query, variables)
+        latency = time.perf_counter() - start
+
+        request_key = self.get_request_key(query, variables)
+        with self._lock:
+            interaction = self.interactions.setdefault(request_key, {
+                "query": self.normalize_query(query),
+                "variables": variables or {},
+                "responses": [],
+            })
+            interaction["responses"].append({"response": response, "latency": latency})
+        return response
+
+    def save(self):
+        # requests abandoned by a wrapping transport may still be recording
+        with self._lock:
+            interactions = {
+                request_key: dict(interaction, responses=list(interaction["responses"]))
+                for request_key, interaction in self.interactions.items()
+            }
+        cassette = {
+            "version": self.CASSETTE_VERSION,
+            "metadata": self.metadata,
+            "interactions": interactions,
+        }
+        tmp_path = f"{self.cassette_path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as cassette_file:
+            json.dump(cassette, cassette_file)
+        os.replace(tmp_path, self.cassette_path)
+
+    def close(self):
+        self.save()
+        self.transport.close()
+
+
+class ReplayTransport(GraphQlTransport):
+    """
+    Serves the responses recorded on a cassette, without network.
+
+    Responses are served at disk speed, or sleeping the recorded latency
+    when ``replay_latency`` is set. A request recorded several times is
+    served in the recorded order, repeating the last response once all
+    of them were served.
+    """
+
+    def __init__(self, cassette_path: str, replay_latency: bool = False):
+        super().__init__()
+        self.cassette_path = cassette_path
+        self.replay_latency = replay_latency
+        with gzip.open(cassette_path, "rt", encoding="utf-8") as cassette_file:
+            cassette = json.load(cassette_file)
+        if cassette.get("version") != RecordingTransport.CASSETTE_VERSION:
+            raise ValueError(f"unsupported cassette version: {cassette_path}")
+        self.metadata = cassette.get("metadata", {})  # type: Dict
+        self.interactions = cassette.get("interactions", {})  # type: Dict[str, Dict]
+        self._served = {}  # type: Dict[str, int]
+        self._lock = threading.Lock()
+
+    def _execute(self, query: str, variables: Dict = None) -> Dict:
+        request_key = self.get_request_key(query, variables)
+        interaction = self.interactions.get(request_key)
+        if interaction is None:
+            raise CassetteMissError(
+                f"request not recorded on cassette {self.cassette_path}: "
+                f"{self.normalize_query(query)[:120]}"
+            )
+
+        responses = interaction["responses"]  # type: List[Dict]
+        with self._lock:
+            served = self._served.get(request_key, 0)
+            self._served[request_key] = served + 1
+        recorded = responses[min(served, len(responses) - 1)]
+
+        if self.replay_latency:
+            time.sleep(recorded["latency"])
+        return recorded["response"]
+
+    def get_recorded_now(self) -> datetime or None:
+        """Time the recorded reports were computed for, if recorded."""
+        if not self.metadata.get("now"):
+            return None
+        return datetime.fromisoformat(self.metadata["now"])
@@ -0,0 +1,300 @@
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from typing import Dict
+from typing import List
+
+from models.GraphQlTransport import GraphQlTransport
+
+logger = logging.getLogger(__name__)
+
+
+class QueryDeadlineExceeded(TimeoutError):
+    pass
+
+
+class ReportDeadlineExceeded(QueryDeadlineExceeded):
+    """The request deadline was shortened by the report deadline and expired."""
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class LatencyTracker(object):
+    """Keeps the latest latencies (in seconds) of each query type."""
+
+    WINDOW_SIZE = 200
+
+    # first root field of the document, skipping its alias if any
+    QUERY_TYPE_REGEX = re.compile(r"^\s*(?:mutation|query)?[^{]*\{\s*(?:\w+\s*:\s*)?(\w+)")
+
+    def __init__(self, window_size: int = WINDOW_SIZE):
+        self.window_size = window_size
+        self._latencies = {}  # type: Dict[str, deque]
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_query_type(cls, query: str) -> str:
+        match = cls.QUERY_TYPE_REGEX.match(query)
+        return match.group(1) if match else "unknown"
+
+    def add(self, query_type: str, latency: float):
+        with self._lock:
+            if query_type not in self._latencies:
+                self._latencies[query_type] = deque(maxlen=self.window_size)
+            self._latencies[query_type].append(latency)
+
+    def get_count(self, query_type: str) -> int:
+        return len(self._latencies.get(query_type, []))
+
+    def get_percentile(self, query_type: str, percentile: float) -> float or None:
+        with self._lock:
+            latencies = sorted(self._latencies.get(query_type, []))
+        if not latencies:
+            return None
+        # nearest-rank percentile
+        rank = max(1, -(-len(latencies) * percentile // 100))
+        return latencies[int(rank) - 1]
+
+    def get_percentiles(self) -> Dict[str, Dict[str, float]]:
+        percentiles = {}
+        for query_type in list(self._latencies):
+            percentiles[query_type] = {
+                "count": self.get_count(query_type),
+                "p50": self.get_percentile(query_type, 50),
+                "p95": self.get_percentile(query_type, 95),
+                "p99": self.get_percentile(query_type, 99),
+            }
+        return percentiles
+
+    def format_percentiles(self) -> List[str]:
+        lines = [f"{'Query Type':<40} {'Count':>8} {'p50 (ms)':>10} {'p95 (ms)':>10} {'p99 (ms)':>10}"]
+        for query_type, stats in sorted(self.get_percentiles().items()):
+            lines.append(
+                f"{query_type:<40} "
+                f"{stats['count']:>8} "
+                f"{stats['p50'] * 1000:>10.1f} "
+                f"{stats['p95'] * 1000:>10.1f} "
+                f"{stats['p99'] * 1000:>10.1f}"
+            )
+        return lines
+
+
+class CircuitBreaker(object):
+    """
+    Opens after ``failure_threshold`` consecutive failures. While open,
+    requests fail fast. After ``reset_timeout`` seconds a single trial
+    request is let through (half-open): its success closes the circuit
+    and its failure opens it again.
+    """
+
+    STATE_CLOSED = "closed"
+    STATE_OPEN = "open"
+    STATE_HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == self.STATE_CLOSED:
+                return True
+            if self.state == self.STATE_OPEN:
+                if time.monotonic() - self._opened_at >= self.reset_timeout:
+                    self.state = self.STATE_HALF_OPEN
+                    return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self.state = self.STATE_CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.STATE_HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.STATE_OPEN:
+                    logger.warning(f"circuit opened after {self._failures} failures")
+                self.state = self.STATE_OPEN
+                self._opened_at = time.monotonic()
+
+
+class ResilientTransport(GraphQlTransport):
+    """
+    Wraps another transport to bound the latency of each request.
+
+    - every request gets a deadline of ``request_timeout`` seconds,
+      capped by the report deadline set with ``start_report_deadline``.
+    - read queries are hedged: when a response takes longer than the
+      p95 latency of its query type, a duplicate request is sent and
+      the first response is used.
+    - a circuit breaker fails fast while the API keeps failing.
+
+    Degraded requests (failed, timed out or rejected by the open
+    circuit) are served from the latest response of the same read
+    query when there is one, then from the ``fallback`` transport (e.g.
+    a ReplayTransport over a recorded cassette).
+
+    Requests abandoned after a deadline are not cancelled: they finish
+    in the background and their response is discarded. For that reason
+    mutations are never put under a deadline nor hedged: they are sent
+    once and waited for, so a mutation reported as failed was not
+    applied in the background.
+    """
+
+    REQUEST_TIMEOUT = 60.0
+    MAX_WORKERS = 16
+    MAX_CACHED_RESPONSES = 256
+    HEDGE_PERCENTILE = 95
+    HEDGE_MIN_SAMPLES = 5
+
+    def __init__(
+        self,
+        transport: GraphQlTransport,
+        request_timeout: float = REQUEST_TIMEOUT,
+        hedge: bool = True,
+        circuit_breaker: CircuitBreaker = None,
+        fallback: GraphQlTransport = None,
+        max_workers: int = MAX_WORKERS,
+    ):
+        super().__init__()
+        self.transport = transport
+        self.request_timeout = request_timeout
+        self.hedge = hedge
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.fallback = fallback
+        self.latency_tracker = LatencyTracker()
+        self.hedged_requests = 0
+        self._hedge_lock = threading.Lock()
+        self._report_deadline = None
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._cached_responses = OrderedDict()  # type: OrderedDict
+        self._cache_lock = threading.Lock()
+
+    @property
+    def client(self):
+        return self.transport.client
+
+    def start_report_deadline(self, seconds: float):
+        self._report_deadline = time.monotonic() + seconds
+
+    def _get_timeout(self) -> float:
+        timeout = self.request_timeout
+        if self._report_deadline is not None:
+            timeout = min(timeout, self._report_deadline - time.monotonic())
+        return timeout
+
+    def _execute(self, query: str, variables: Dict = None) -> Dict:
+        query_type = self.latency_tracker.get_query_type(query)
+        is_read = not query.lstrip().startswith("mutation")
+        request_key = self.get_request_key(query, variables)
+
+        if self._get_timeout() <= 0:
+            # not an API failure: the circuit breaker is left untouched
+            return self._fallback(
+                query, variables, request_key, is_read,
+                ReportDeadlineExceeded(f"report deadline exceeded before {query_type} request"),
+            )
+
+        if not self.circuit_breaker.allow_request():
+            return self._fallback(
+                query, variables, request_key, is_read,
+                CircuitOpenError(f"circuit open, {query_type} request rejected"),
+            )
+
+        try:
+            if is_read:
+                response = self._execute_with_deadline(query, variables, query_type, is_read)
+            else:
+                response = self._timed_execute(query, variables, query_type)
+        except ReportDeadlineExceeded as error:
+            # not an API failure either: the request ran out of report time
+            return self._fallback(query, variables, request_key, is_read, error)
+        except Exception as error:
+            self.circuit_breaker.record_failure()
+            return self._fallback(query, variables, request_key, is_read, error)
+
+        self.circuit_breaker.record_success()
+        if is_read:
+            with self._cache_lock:
+                self._cached_responses[request_key] = response
+                self._cached_responses.move_to_end(request_key)
+                if len(self._cached_responses) > self.MAX_CACHED_RESPONSES:
+                    self._cached_responses.popitem(last=False)
+        return response
+
+    def _execute_with_deadline(self, query: str, variables: Dict, query_type: str, is_read: bool) -> Dict:
+        timeout = self._get_timeout()
+        deadline = time.monotonic() + timeout
+        is_report_deadline = bool(timeout < self.request_timeout)
+
+        futures = [self._executor.submit(self._timed_execute, query, variables, query_type)]
+
+        hedge_delay = None
+        if self.hedge and is_read and self.latency_tracker.get_count(query_type) >= self.HEDGE_MIN_SAMPLES:
+            hedge_delay = self.latency_tracker.get_percentile(query_type, self.HEDGE_PERCENTILE)
+
+        if hedge_delay is not None and hedge_delay < timeout:
+            done, _ = wait(futures, timeout=hedge_delay)
+            if not done:
+                with self._hedge_lock:
+                    self.hedged_requests += 1
+                futures.append(self._executor.submit(self._timed_execute, query, variables, query_type))
+
+        last_error = None
+        pending = set(futures)
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                last_error = future.exception()
+
+        if last_error is not None and not pending:
+            raise last_error
+        if is_report_deadline:
+            raise ReportDeadlineExceeded(f"{query_type} request exceeded the report deadline ({timeout:.1f} s left)")
+        raise QueryDeadlineExceeded(f"{query_type} request exceeded its deadline of {timeout:.1f} s")
+
+    def _timed_execute(self, query: str, variables: Dict, query_type: str) -> Dict:
+        start = time.perf_counter()
+        response = self.transport.execute(query, variables)
+        self.latency_tracker.add(query_type, time.perf_counter() - start)
+        return response
+
+    def _fallback(self, query: str, variables: Dict, request_key: str, is_read: bool, error: Exception) -> Dict:
+        if is_read:
+            with self._cache_lock:
+                cached_response = self._cached_responses.get(request_key)
+            if cached_response is not None:
+                logger.warning(f"{error} - serving cached response")
+                return cached_response
+            if self.fallback is not None:
+                try:
+                    fallback_response = self.fallback.execute(query, variables)
+                except Exception:
+                    raise error
+                logger.warning(f"{error} - serving fallback response")
+                return fallback_response
+        raise error
+
+    def close(self):
+        # abandoned reads are not waited for, their responses are discarded
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.transport.close()
+        if self.fallback is not None:
+            self.fallback.close()
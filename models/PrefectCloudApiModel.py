@@ -1,23 +1,45 @@
+import logging
 import os
 import pathlib
-from zoneinfo import ZoneInfo
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfoNotFoundError
 
 from typing import Dict
 from typing import List
 
 from cron_descriptor import get_description, Options, CasingTypeEnum
-from cron_converter import Cron
 from decouple import config
 
 import queries
+from models.CapacityForecast import CapacityForecast
+from models.CronExpansion import get_cron_expansion
+from models.FetchPlanner import FetchPlan, FetchPlanner
+from models.FlowRunMonitor import FlowRunMonitor, FlowRunStatus
+from models.GraphQlTransport import GraphQlTransport, PrefectClientTransport
+from models.ScheduleForecast import ScheduleForecast, get_zone, parse_timezone_names
+from models.ScheduleInventory import ScheduleInventory
+from models.ScheduleJournal import ScheduleJournal, ScheduleOperation
+from models.TenantSnapshot import TenantSnapshot, SnapshotVersionError
 
 # add backend path to environment
 backend_abspath = os.path.join(pathlib.Path(__file__).parent, 'config', 'backend.toml')
 os.environ["PREFECT__BACKEND_CONFIG_PATH"] = backend_abspath
 
+logger = logging.getLogger(__name__)
+
 # get values from env
 LOCAL_TIMEZONE = config("LOCAL_TIMEZONE", default='localtime')
 LOCAL_TIMEZONE_STR_FMT = "%I:%M %p"
+FORECAST_TIMEZONES = config(
+    "FORECAST_TIMEZONES",
+    default=LOCAL_TIMEZONE,
+    cast=parse_timezone_names,
+)
+FORECAST_STR_FMT = f"%m-%d {LOCAL_TIMEZONE_STR_FMT}"
 
 pair_hours = "2,4,6,8,10,12,14,16,18,20,22"
 odd_hours = "1,3,5,7,9,11,13,15,17,19,21,23"
@@ -36,14 +58,79 @@ CRON_DESCRIPTOR_OPTIONS.casing_type = CasingTypeEnum.Sentence
 CRON_DESCRIPTOR_OPTIONS.use_24hour_time_format = True
 
 
+def escape_graphql_string(value: str) -> str:
+    """Escapes a value to be placed inside a GraphQL string literal."""
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _get_current_minute() -> datetime:
+    return datetime.now(timezone.utc).replace(second=0, microsecond=0)
+
+
+@lru_cache(maxsize=1024)
+def _get_cron_next_datetime(
+    canonical_value: str,
+    timezone_name: str,
+    current_minute: datetime,
+    clock_zone=None,
+    start_date: datetime = None,
+    end_date: datetime = None,
+) -> datetime or None:
+    # current minute is part of the cache key, so next runs never go stale
+    next_fire_times = get_cron_expansion(canonical_value).get_next_fire_times(
+        current_minute, 1, clock_zone, start_date, end_date
+    )
+    if not next_fire_times:
+        return None
+    return next_fire_times[0].astimezone(get_zone(timezone_name))
+
+
+@lru_cache(maxsize=1024)
+def _get_cron_human_description(
+    cron_value: str,
+    timezone_name: str,
+    current_minute: datetime,
+    clock_timezone_str: str = "(UTC)",
+    clock_zone=None,
+    start_date: datetime = None,
+    end_date: datetime = None,
+) -> str:
+    # convert cron string value into human-readable string. The wording
+    # follows the expression as configured, while the next run is
+    # computed once for all the equivalent expressions.
+    cron_human_description = get_description(
+        expression=cron_value,
+        options=CRON_DESCRIPTOR_OPTIONS,
+    )
+    canonical_value = get_cron_expansion(cron_value).canonical_value
+    converted_datetime = _get_cron_next_datetime(
+        canonical_value, timezone_name, current_minute, clock_zone, start_date, end_date
+    )
+    converted_datetime_str = converted_datetime.strftime(LOCAL_TIMEZONE_STR_FMT) if converted_datetime else "-"
+    return (
+        f"{cron_human_description} {clock_timezone_str} --- "
+        f"[ {converted_datetime_str} - ({timezone_name}) ]"
+    )
+
+
 class ScheduleClock(object):
 
     UTC_STR = "(UTC)"
+    UTC_TIMEZONES = ("UTC", "Etc/UTC", "+00:00")
 
     def __init__(self, clock_data):
         self.type = clock_data.get("type")
         self.value = clock_data.get("cron", "")
         self.parameters = self._get_parameters(clock_data)
+        self.start_date, start_timezone, start_zone = self._get_date(clock_data, "start_date")
+        self.end_date, _, _ = self._get_date(clock_data, "end_date")
+        # cron clocks are evaluated in the timezone of their start date.
+        # zone is None when that timezone is unknown.
+        self.timezone = start_timezone or "UTC"
+        self.zone = start_zone if start_timezone else timezone.utc
+        if self.is_utc():
+            self.timezone = "UTC"
+            self.zone = timezone.utc
 
     def _get_parameters(self, clock_data):
         raw_parameters = clock_data.get("parameter_defaults", {})
@@ -52,31 +139,57 @@ class ScheduleClock(object):
             parameters[key] = value
         return parameters
 
+    @staticmethod
+    def _get_date(clock_data, field: str):
+        # dates are serialized as {"dt": <naive iso>, "tz": <timezone>}
+        date_data = clock_data.get(field)
+        if not date_data:
+            return None, None, None
+        if isinstance(date_data, dict):
+            date_str, timezone_name = date_data.get("dt"), date_data.get("tz")
+        else:
+            date_str, timezone_name = date_data, None
+
+        date = datetime.fromisoformat(date_str)
+        if date.tzinfo is not None:
+            offset = date.utcoffset()
+            return date, "UTC" if not offset else str(date.tzinfo), date.tzinfo
+        timezone_name = timezone_name or "UTC"
+        try:
+            zone = get_zone(timezone_name)
+        except (ZoneInfoNotFoundError, ValueError):
+            logger.warning(f"unknown timezone of clock {field}: {timezone_name}")
+            return None, timezone_name, None
+        return date.replace(tzinfo=zone), timezone_name, zone
+
+    def is_utc(self):
+        return bool(self.timezone in self.UTC_TIMEZONES)
+
+    def get_timezone_str(self):
+        return self.UTC_STR if self.is_utc() else f"({self.timezone})"
+
     def get_converted_datetime_from_cron_value(
         self,
         cron_value: str,
         timezone: str = "localtime"
     ):
-        cron_schedule = Cron(cron_value).schedule()
-        cron_datetime_utc = cron_schedule.next()
-        converted_datetime = cron_datetime_utc.astimezone(ZoneInfo(timezone))
-        return converted_datetime
+        canonical_value = get_cron_expansion(cron_value).canonical_value
+        return _get_cron_next_datetime(canonical_value, timezone, _get_current_minute())
+
+    def get_canonical_value(self):
+        if self.is_cron():
+            return get_cron_expansion(self.value).canonical_value
+        return None
 
     def get_human_description(self):
         if self.is_cron():
-            # convert cron string value into human-readable string
-            cron_human_description = get_description(
-                expression=self.value,
-                options=CRON_DESCRIPTOR_OPTIONS,
-            )
-            converted_datetime = self.get_converted_datetime_from_cron_value(
-                cron_value=self.value,
-                timezone=LOCAL_TIMEZONE
-            )
-            converted_datetime_str = converted_datetime.strftime(LOCAL_TIMEZONE_STR_FMT)
-            return (
-                f"{cron_human_description} {self.UTC_STR} --- "
-                f"[ {converted_datetime_str} - ({LOCAL_TIMEZONE}) ]"
+            # description is computed once per distinct expression and
+            # next run once per distinct schedule
+            if self.zone is None:
+                return f"{self.value} {self.get_timezone_str()} --- [ unknown timezone ]"
+            return _get_cron_human_description(
+                self.value, LOCAL_TIMEZONE, _get_current_minute(),
+                self.get_timezone_str(), self.zone, self.start_date, self.end_date,
             )
         return "NA"
 
@@ -137,6 +250,8 @@ class FlowObject(object):
 
 
 class FlowGroupObject(object):
+    # fields queried for every flow group, besides its flows
+    QUERIED_FIELDS = ["name", "id", "labels", "schedule"]
 
     def __init__(self, flow_group_data):
         self.name = None
@@ -145,12 +260,17 @@ class FlowGroupObject(object):
         self.schedules = []  # type: List[ScheduleClock]
         self.flows = []  # type: List[FlowObject]
         self.project = None  # type: ProjectObject or None
+        self.extra_fields = {}  # type: Dict
         self._retrieve_values(flow_group_data)
 
     def _retrieve_values(self, raw_data: Dict):
         self.name = raw_data.get("name")
         self.id = raw_data.get("id")
         self.labels = raw_data.get("labels")
+        self.extra_fields = {
+            field: value for field, value in raw_data.items()
+            if field not in self.QUERIED_FIELDS and field != "flows"
+        }
 
         schedule_data = raw_data.get("schedule", {})
         if schedule_data:
@@ -336,6 +456,31 @@ class PrefectCloudApiModel(object):
     REPORT_TITLE_PROJECT = "Project"
     REPORT_TITLE_ACTIVE = "Active"
     REPORT_TITLE_SCHEDULE_CONFIG = "Schedule (Config)"
+    REPORT_TITLE_FLOW_GROUPS = "Flow Groups"
+    REPORT_TITLE_CRON_CLOCKS = "Cron Clocks"
+    REPORT_TITLE_FLOW_VERSIONS = "Flow Versions"
+    REPORT_TITLE_TOTAL = "TOTAL"
+    REPORT_TITLE_UPCOMING = "Upcoming"
+    REPORT_TITLE_LATE = "Late"
+    REPORT_TITLE_MISSING = "Missing"
+    REPORT_TITLE_LABELS = "Labels"
+    REPORT_TITLE_RUNS = "Runs"
+    REPORT_TITLE_PEAK = "Peak"
+    REPORT_TITLE_PEAK_TIME = "Peak Time"
+    REPORT_TITLE_CAPACITY = "Capacity"
+    REPORT_TITLE_SCHEDULE = "Schedule"
+    REPORT_TITLE_FLOWS = "Flows"
+
+    SUMMARY_FLOW_GROUPS = "flow_groups"
+    SUMMARY_SCHEDULE_ACTIVE = "schedule_active"
+    SUMMARY_CRON_CLOCKS = "cron_clocks"
+    SUMMARY_FLOWS = "flows"
+    SUMMARY_FIELDS = [
+        SUMMARY_FLOW_GROUPS,
+        SUMMARY_SCHEDULE_ACTIVE,
+        SUMMARY_CRON_CLOCKS,
+        SUMMARY_FLOWS,
+    ]
 
     REPORT_SEPARATOR = 120
 
@@ -343,15 +488,41 @@ class PrefectCloudApiModel(object):
     SORT_SCHEDULE_ACTIVE = "active"
     SORT_SCHEDULE_CONFIG = "schedule"
 
-    def __init__(self, api_key: str = None, tenant_id: str = None):
-        import prefect
-        if api_key and tenant_id:
-            self.client = prefect.Client(api_key=api_key, tenant_id=tenant_id)
-        else:
-            self.client = prefect.Client()
+    # snapshots are invalidated when the general report query changes
+    SNAPSHOT_QUERY_SHAPE = queries.Q_ALL_FLOW_GROUPS_WITH_PROJECT_FILTER.replace(
+        "$_FLOW_GROUP_FIELDS", " ".join(FlowGroupObject.QUERIED_FIELDS)
+    )
 
-    def execute_raw_query(self, query):
-        response = self.client.graphql(query)
+    # seconds a fetch plan (and its aggregate probes) is reused
+    FETCH_PLAN_TTL = 60
+
+    # max mutations sent on each batched mutation request
+    MUTATION_BATCH_SIZE = 25
+
+    # max flow ids sent on each windowed flow run query
+    FLOW_RUN_BATCH_SIZE = 200
+    FLOW_RUN_PAGE_SIZE = 1000
+
+    def __init__(
+        self,
+        api_key: str = None,
+        tenant_id: str = None,
+        transport: GraphQlTransport = None,
+    ):
+        if transport is None:
+            transport = PrefectClientTransport(api_key=api_key, tenant_id=tenant_id)
+        self.transport = transport
+        self._fetch_plans = {}  # type: Dict[tuple, tuple]
+
+    @property
+    def client(self):
+        return self.transport.client
+
+    def close(self):
+        self.transport.close()
+
+    def execute_raw_query(self, query, variables: Dict = None):
+        response = self.transport.execute(query, variables)
         return response
 
     def query_flows(self, project_name, order_by_field="version"):
@@ -367,8 +538,8 @@ class PrefectCloudApiModel(object):
             fields_list=fields_to_query,
             order_by=order_by_field,
         )
-        print(query)
-        response = self.client.graphql(query)
+        logger.debug(f"flows query: {query}")
+        response = self.execute_raw_query(query)
         return response
 
     def query_flow_groups(self, project_name, order_by_field="updated"):
@@ -385,34 +556,266 @@ class PrefectCloudApiModel(object):
             fields_list=fields_to_query,
             order_by=order_by_field,
         )
-        response = self.client.graphql(query)
+        response = self.execute_raw_query(query)
         return response
 
-    def activate_workflows_schedule_by_project(self, project_name):
+    def activate_workflows_schedule_by_project(
+        self,
+        project_name: str,
+        journal_path: str = None,
+        batch_size: int = MUTATION_BATCH_SIZE,
+    ) -> Dict[str, int]:
+        """
+        Activates the schedule of the latest flow of every flow group in
+        the projects matching the given name. Flows already active are
+        skipped, so only the needed mutations are sent.
+        """
+        query = self._get_query_from_factory(project_filter=project_name, latest_only=True)
+        response = self.execute_raw_query(query)
+
+        operations = []
+        skipped_operations = []
+        for flow_group in response.get('data', {}).get('flow_group', []):
+            latest_flow = FlowGroupObject(flow_group).get_latest_flow()
+            operation = ScheduleOperation(
+                kind=ScheduleOperation.KIND_ACTIVATE,
+                target_id=latest_flow.id,
+                target_name=latest_flow.get_versioned_name(),
+            )
+            if latest_flow.is_schedule_active():
+                skipped_operations.append(operation)
+            else:
+                operations.append(operation)
 
-        flow_group_ids = {}
-        query = queries.Q_FLOWS_FROM_PROJECT.replace(
-            "$_PROJECT_NAME", project_name
+        return self.apply_schedule_operations(
+            operations,
+            skipped_operations=skipped_operations,
+            journal_path=journal_path,
+            batch_size=batch_size,
         )
+
+    def setup_cron_schedules(
+        self,
+        cron_by_flow_group_id: Dict[str, str],
+        journal_path: str = None,
+        batch_size: int = MUTATION_BATCH_SIZE,
+    ) -> Dict[str, int]:
+        """
+        Sets a single cron clock on each given flow group. Flow groups
+        whose schedule already is that single (equivalent) cron clock are
+        skipped.
+        """
+        if not cron_by_flow_group_id:
+            return self.apply_schedule_operations([], journal_path=journal_path)
+
+        flow_group_ids_as_str = ", ".join(f'"{flow_group_id}"' for flow_group_id in cron_by_flow_group_id)
+        query = queries.Q_FLOW_GROUP_SCHEDULES_BY_IDS.replace("$_FLOW_GROUP_IDS", flow_group_ids_as_str)
         response = self.execute_raw_query(query)
-        flows_data = response.get('data').get('flow')
-        for flow in flows_data:
-            flow_id = flow.get('id')
-            flow_name = flow.get('name')
+        schedule_by_flow_group_id = {
+            flow_group.get('id'): flow_group.get('schedule') or {}
+            for flow_group in response.get('data', {}).get('flow_group', [])
+        }
+
+        operations = []
+        skipped_operations = []
+        for flow_group_id, cron_value in cron_by_flow_group_id.items():
+            operation = ScheduleOperation(
+                kind=ScheduleOperation.KIND_SET_CRON,
+                target_id=flow_group_id,
+                cron=cron_value,
+            )
+            current_clocks = [
+                ScheduleClock(clock_data)
+                for clock_data in schedule_by_flow_group_id.get(flow_group_id, {}).get("clocks", [])
+            ]
+            is_same_schedule = (
+                len(current_clocks) == 1 and
+                current_clocks[0].is_cron() and
+                not current_clocks[0].parameters and
+                get_cron_expansion(current_clocks[0].value).canonical_key ==
+                get_cron_expansion(cron_value).canonical_key
+            )
+            if is_same_schedule:
+                skipped_operations.append(operation)
+            else:
+                operations.append(operation)
 
-            # mutation =
-            response = self.execute_raw_query(queries.M_ACTIVATE_SCHEDULE)
-        a = 0
+        return self.apply_schedule_operations(
+            operations,
+            skipped_operations=skipped_operations,
+            journal_path=journal_path,
+            batch_size=batch_size,
+        )
+
+    def apply_schedule_operations(
+        self,
+        operations: List[ScheduleOperation],
+        skipped_operations: List[ScheduleOperation] = None,
+        journal_path: str = None,
+        batch_size: int = MUTATION_BATCH_SIZE,
+    ) -> Dict[str, int]:
+        """
+        Sends the schedule operations as batched mutations (one aliased
+        mutation per operation). With a journal, operations completed by
+        a previous execution are not sent again and every batch result
+        is journaled before the next batch is sent.
+        """
+        journal = ScheduleJournal(journal_path) if journal_path else None
+        result = {"completed": 0, "skipped": 0, "failed": 0, "resumed": 0}
+
+        try:
+            if skipped_operations:
+                result["skipped"] = len(skipped_operations)
+                if journal:
+                    journal.record(ScheduleJournal.EVENT_SKIPPED, skipped_operations, reason="no-op")
+
+            pending_operations = operations
+            if journal:
+                pending_operations = [operation for operation in operations if not journal.is_done(operation)]
+                result["resumed"] = len(operations) - len(pending_operations)
+                journal.record(ScheduleJournal.EVENT_PLANNED, pending_operations)
+
+            for batch_start in range(0, len(pending_operations), batch_size):
+                batch = pending_operations[batch_start:batch_start + batch_size]
+                try:
+                    response = self.execute_raw_query(self._get_batch_mutation(batch))
+                except Exception as error:
+                    if journal:
+                        journal.record(ScheduleJournal.EVENT_FAILED, batch, reason=str(error))
+                    raise
+
+                mutation_data = response.get('data', {}) or {}
+                completed = []
+                failed = []
+                for index, operation in enumerate(batch):
+                    if (mutation_data.get(f"m{index}") or {}).get('success'):
+                        completed.append(operation)
+                    else:
+                        failed.append(operation)
+                result["completed"] += len(completed)
+                result["failed"] += len(failed)
+                if journal:
+                    journal.record(ScheduleJournal.EVENT_COMPLETED, completed)
+                    if failed:
+                        journal.record(ScheduleJournal.EVENT_FAILED, failed, reason="success: false")
+        finally:
+            if journal:
+                journal.close()
+
+        return result
+
+    def _get_batch_mutation(self, operations: List[ScheduleOperation]) -> str:
+        mutation_fields = []
+        for index, operation in enumerate(operations):
+            if operation.kind == ScheduleOperation.KIND_ACTIVATE:
+                mutation_field = queries.M_ACTIVATE_SCHEDULE_FIELD.replace(
+                    "$_FLOW_ID", operation.target_id
+                )
+            else:
+                mutation_field = queries.M_SETUP_CRON_SCHEDULE_FIELD.replace(
+                    "$_FLOW_GROUP_ID", operation.target_id
+                ).replace(
+                    "$_FLOW_CRON", operation.cron
+                )
+            mutation_fields.append(mutation_field.replace("$_ALIAS", f"m{index}"))
+        return queries.M_BATCH_MUTATION.replace("$_MUTATION_FIELDS", "".join(mutation_fields))
+
+    def query_project_names(self, project_filters: list[str] = None) -> list[str]:
+        if not project_filters:
+            project_filters = [""]
+
+        project_names = []
+        for project_filter in project_filters:
+            query = queries.Q_PROJECT_NAMES_WITH_PROJECT_FILTER.replace(
+                "$_PROJECT_NAME", escape_graphql_string(project_filter)
+            )
+            response = self.execute_raw_query(query)
+            for project in response.get('data', {}).get('project', []):
+                if project.get('name') not in project_names:
+                    project_names.append(project.get('name'))
+        return project_names
+
+    def query_summary(self, project_filters: list[str] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Counts flow groups, schedule-active flow groups, cron configured
+        flow groups and flow versions per project using the server-side
+        aggregate fields. No flow group data is downloaded: all the
+        project counts are resolved in a single aggregate query.
+        """
+        project_names = self.query_project_names(project_filters)
+        if not project_names:
+            return {}
+
+        summary_blocks = []
+        for index, project_name in enumerate(project_names):
+            summary_block = queries.Q_PROJECT_SUMMARY_BLOCK.replace(
+                "$_ALIAS", f"p{index}"
+            ).replace(
+                "$_PROJECT_NAME", escape_graphql_string(project_name)
+            )
+            summary_blocks.append(summary_block)
+        query = queries.Q_AGGREGATE_SUMMARY.replace(
+            "$_SUMMARY_BLOCKS", "".join(summary_blocks)
+        )
+
+        response = self.execute_raw_query(query)
+        summary_data = response.get('data', {})
+
+        summary = {}  # type: Dict[str, Dict[str, int]]
+        for index, project_name in enumerate(project_names):
+            summary[project_name] = {}
+            for summary_field in self.SUMMARY_FIELDS:
+                aggregate_data = summary_data.get(f"p{index}_{summary_field}", {})
+                count = aggregate_data.get('aggregate', {}).get('count', 0)
+                summary[project_name][summary_field] = int(count or 0)
+        return summary
+
+    def print_report_summary(self, project_filters: list[str] = None):
+
+        summary = self.query_summary(project_filters)
+
+        self._print_report_separator()
+        print(
+            f"{self.REPORT_TITLE_PROJECT:<45} "
+            f"{self.REPORT_TITLE_FLOW_GROUPS:>15} "
+            f"{self.REPORT_TITLE_ACTIVE:>15} "
+            f"{self.REPORT_TITLE_CRON_CLOCKS:>15} "
+            f"{self.REPORT_TITLE_FLOW_VERSIONS:>15}"
+        )
+        self._print_report_separator()
+
+        totals = {summary_field: 0 for summary_field in self.SUMMARY_FIELDS}
+        for project_name, project_summary in summary.items():
+            for summary_field in self.SUMMARY_FIELDS:
+                totals[summary_field] += project_summary[summary_field]
+            print(
+                f"{project_name:<45} "
+                f"{project_summary[self.SUMMARY_FLOW_GROUPS]:>15} "
+                f"{project_summary[self.SUMMARY_SCHEDULE_ACTIVE]:>15} "
+                f"{project_summary[self.SUMMARY_CRON_CLOCKS]:>15} "
+                f"{project_summary[self.SUMMARY_FLOWS]:>15}"
+            )
+
+        self._print_report_separator()
+        print(
+            f"{self.REPORT_TITLE_TOTAL:<45} "
+            f"{totals[self.SUMMARY_FLOW_GROUPS]:>15} "
+            f"{totals[self.SUMMARY_SCHEDULE_ACTIVE]:>15} "
+            f"{totals[self.SUMMARY_CRON_CLOCKS]:>15} "
+            f"{totals[self.SUMMARY_FLOWS]:>15}"
+        )
+        self._print_report_separator()
 
     def _print_report_separator(self):
         print("-" * self.REPORT_SEPARATOR)
 
     def print_report_schedule_active(self, project_filter: str = None):
 
-        query = self._get_query_from_factory(project_filter, include_schedule_only=True)
-
-        response = self.execute_raw_query(query)
-        flow_group_data = response.get('data', {}).get('flow_group', {})
+        flow_groups = self.iter_flow_groups(
+            [project_filter] if project_filter else None,
+            only_latest=True,
+            schedule_only=True,
+        )
 
         self._print_report_separator()
         print(f"{self.REPORT_TITLE_WORKFLOW:<55} {self.REPORT_TITLE_PROJECT:<25} {self.REPORT_TITLE_SCHEDULE_CONFIG:<15}")
@@ -420,9 +823,7 @@ class PrefectCloudApiModel(object):
 
         flow_groups_by_project = {}  # type: Dict[str, List]
 
-        for flow_group in flow_group_data:
-
-            flow_group_obj = FlowGroupObject(flow_group)
+        for flow_group_obj in flow_groups:
             if not flow_group_obj.schedules:
                 continue
 
@@ -474,17 +875,17 @@ class PrefectCloudApiModel(object):
         sort_by: str = None,
     ):
 
-        query = self._get_query_from_factory(project_filter, include_schedule_only=True)
-
-        response = self.execute_raw_query(query)
-        flow_group_data = response.get('data', {}).get('flow_group', {})
+        flow_groups = self.iter_flow_groups(
+            [project_filter] if project_filter else None,
+            only_latest=True,
+            schedule_only=True,
+        )
 
         self._print_common_report_header(sort_by)
 
         flow_groups_by_project = {}  # type: Dict[str, List]
 
-        for flow_group in flow_group_data:
-            flow_group_obj = FlowGroupObject(flow_group)
+        for flow_group_obj in flow_groups:
             if flow_group_obj.schedules:
                 first_clock = flow_group_obj.schedules[0]
                 if first_clock.is_cron():
@@ -519,38 +920,308 @@ class PrefectCloudApiModel(object):
                 print(result)
         print("")
 
+    def iter_flow_run_statuses(
+        self,
+        project_filters: list[str] = None,
+        monitor: FlowRunMonitor = None,
+        batch_size: int = FLOW_RUN_BATCH_SIZE,
+    ):
+        """
+        Yields a FlowRunStatus for each schedule-active flow group.
+        Flow groups are checked in batches: a batch collects up to
+        ``batch_size`` flow ids which are resolved with windowed and
+        paginated flow run queries, so only one batch of runs is held
+        in memory at a time.
+        """
+        if monitor is None:
+            monitor = FlowRunMonitor()
+
+        flow_group_batch = []  # type: List[FlowGroupObject]
+        flow_ids_in_batch = 0
+        for flow_group in self._iter_schedule_active_flow_groups(project_filters):
+            flow_group_batch.append(flow_group)
+            flow_ids_in_batch += len(flow_group.flows)
+            if flow_ids_in_batch >= batch_size:
+                yield from self._evaluate_flow_run_batch(flow_group_batch, monitor)
+                flow_group_batch = []
+                flow_ids_in_batch = 0
+
+        if flow_group_batch:
+            yield from self._evaluate_flow_run_batch(flow_group_batch, monitor)
+
+    def _iter_schedule_active_flow_groups(self, project_filters: list[str] = None):
+        for flow_group in self.iter_flow_groups(project_filters, schedule_only=True):
+            if flow_group.get_latest_flow().is_schedule_active():
+                yield flow_group
+
+    def _evaluate_flow_run_batch(
+        self,
+        flow_group_batch: List[FlowGroupObject],
+        monitor: FlowRunMonitor,
+    ):
+        flow_group_id_by_flow_id = {}
+        for flow_group in flow_group_batch:
+            for flow in flow_group.flows:
+                flow_group_id_by_flow_id[flow.id] = flow_group.id
+
+        flow_ids_as_str = ", ".join(f'"{flow_id}"' for flow_id in flow_group_id_by_flow_id)
+        query_template = queries.Q_FLOW_RUNS_BY_FLOW_IDS_IN_WINDOW.replace(
+            "$_FLOW_IDS", flow_ids_as_str
+        ).replace(
+            "$_WINDOW_START", monitor.format_datetime(monitor.window_start)
+        ).replace(
+            "$_WINDOW_END", monitor.format_datetime(monitor.window_end)
+        ).replace(
+            "$_LIMIT", str(self.FLOW_RUN_PAGE_SIZE)
+        )
+
+        flow_runs_by_flow_group = {}  # type: Dict[str, List[Dict]]
+        offset = 0
+        while True:
+            query = query_template.replace("$_OFFSET", str(offset))
+            response = self.execute_raw_query(query)
+            flow_runs = response.get('data', {}).get('flow_run', [])
+            for flow_run in flow_runs:
+                flow_group_id = flow_group_id_by_flow_id.get(flow_run.get('flow_id'))
+                flow_runs_by_flow_group.setdefault(flow_group_id, []).append(flow_run)
+            if len(flow_runs) < self.FLOW_RUN_PAGE_SIZE:
+                break
+            offset += self.FLOW_RUN_PAGE_SIZE
+
+        for flow_group in flow_group_batch:
+            yield monitor.evaluate(flow_group, flow_runs_by_flow_group.get(flow_group.id, []))
+
+    def print_report_flow_runs(
+        self,
+        project_filters: list[str] = None,
+        lookback_hours: int = 24,
+        lookahead_hours: int = 6,
+        now: datetime = None,
+    ):
+        monitor = FlowRunMonitor(
+            lookback_hours=lookback_hours,
+            lookahead_hours=lookahead_hours,
+            now=now,
+        )
+
+        statuses_by_project = {}  # type: Dict[str, List[FlowRunStatus]]
+        for status in self.iter_flow_run_statuses(project_filters, monitor):
+            statuses_by_project.setdefault(status.project_name, []).append(status)
+
+        window_start_str = monitor.window_start.strftime("%Y-%m-%d %H:%M")
+        window_end_str = monitor.window_end.strftime("%Y-%m-%d %H:%M")
+        print(f"Flow runs window: {window_start_str} - {window_end_str} {ScheduleClock.UTC_STR}")
+        self._print_report_separator()
+        print(
+            f"{self.REPORT_TITLE_WORKFLOW:<62} "
+            f"{self.REPORT_TITLE_PROJECT:<25} "
+            f"{self.REPORT_TITLE_UPCOMING:>10} "
+            f"{self.REPORT_TITLE_LATE:>10} "
+            f"{self.REPORT_TITLE_MISSING:>10}"
+        )
+        self._print_report_separator()
+
+        for project_name, statuses in statuses_by_project.items():
+            late_backlog = sum(status.late_runs for status in statuses)
+            missing_backlog = sum(status.missing_runs for status in statuses)
+            unchecked_clocks = sum(status.unchecked_clocks for status in statuses)
+            backlog_str = f"backlog: {late_backlog} late, {missing_backlog} missing"
+            if unchecked_clocks:
+                backlog_str += f", {unchecked_clocks} clocks not checked"
+            print("")
+            print(f"> {project_name} ({backlog_str})")
+
+            statuses.sort(key=lambda _status: (not _status.is_flagged(), _status.flow_name))
+            for status in statuses:
+                flow_name_with_v = f"|- {status.flow_name}"
+                if status.is_flagged():
+                    flow_name_with_v = f"|- [!] {status.flow_name}"
+                print(
+                    f"{flow_name_with_v:<62} "
+                    f"{status.project_name:<25} "
+                    f"{status.upcoming_runs:>10} "
+                    f"{status.late_runs:>10} "
+                    f"{status.missing_runs:>10}"
+                )
+                if status.late_samples:
+                    late_as_str = ", ".join(
+                        late_time.strftime("%Y-%m-%d %H:%M") for late_time in status.late_samples
+                    )
+                    print(f"|---- [Late]: {late_as_str}")
+                if status.missing_samples:
+                    missing_as_str = ", ".join(
+                        missing_time.strftime("%Y-%m-%d %H:%M") for missing_time in status.missing_samples
+                    )
+                    print(f"|---- [Missing]: {missing_as_str}")
+                if status.unchecked_clocks:
+                    print(f"|---- [Not checked]: {status.unchecked_clocks} clocks in an unknown timezone")
+        print("")
+
+    def print_report_capacity_forecast(
+        self,
+        project_filters: list[str] = None,
+        horizon_hours: int = 24,
+        bucket_minutes: int = 15,
+        run_minutes: int = 15,
+        agent_capacity: int = 10,
+    ):
+        forecast = CapacityForecast(
+            horizon_hours=horizon_hours,
+            bucket_minutes=bucket_minutes,
+            run_minutes=run_minutes,
+            default_capacity=agent_capacity,
+        )
+        for flow_group in self._iter_schedule_active_flow_groups(project_filters):
+            forecast.add_flow_group(flow_group)
+        demands = forecast.compute()
+
+        start_str = forecast.start.strftime("%Y-%m-%d %H:%M")
+        end_str = forecast.end.strftime("%Y-%m-%d %H:%M")
+        print(
+            f"Capacity forecast: {start_str} - {end_str} {ScheduleClock.UTC_STR} "
+            f"| buckets of {bucket_minutes} min | runs of {run_minutes} min"
+        )
+        self._print_report_separator()
+        print(
+            f"{self.REPORT_TITLE_LABELS:<50} "
+            f"{self.REPORT_TITLE_FLOW_GROUPS:>12} "
+            f"{self.REPORT_TITLE_RUNS:>8} "
+            f"{self.REPORT_TITLE_PEAK:>8} "
+            f"{self.REPORT_TITLE_CAPACITY:>10}   "
+            f"{self.REPORT_TITLE_PEAK_TIME:<20}"
+        )
+        self._print_report_separator()
+
+        sorted_demands = sorted(
+            demands.values(),
+            key=lambda _demand: (not _demand.is_overcommitted(), -_demand.get_peak()),
+        )
+        for demand in sorted_demands:
+            label_key = demand.label_key
+            if demand.is_overcommitted():
+                label_key = f"[!] {label_key}"
+            peak_time = forecast.get_bucket_start(demand.get_peak_bucket())
+            peak_time_str = peak_time.strftime("%Y-%m-%d %H:%M") if demand.get_peak() else "-"
+            print(
+                f"{label_key:<50} "
+                f"{demand.flow_groups:>12} "
+                f"{demand.get_total_runs():>8} "
+                f"{demand.get_peak():>8} "
+                f"{demand.capacity:>10}   "
+                f"{peak_time_str:<20}"
+            )
+        print("")
+
+    def print_report_schedule_inventory(
+        self,
+        project_filters: list[str] = None,
+        forecast_runs: int = 0,
+        forecast_timezones: list[str] = None,
+    ):
+
+        inventory = ScheduleInventory()
+        for flow_group_obj in self.iter_flow_groups(project_filters, only_latest=True):
+            if flow_group_obj.schedules:
+                inventory.add_flow_group(flow_group_obj)
+
+        schedules = inventory.get_schedules()
+
+        forecast = None
+        if forecast_runs:
+            forecast = ScheduleForecast(forecast_timezones or FORECAST_TIMEZONES, runs=forecast_runs)
+            forecast.add_clocks(schedule.clock for schedule in schedules)
+
+        print(
+            f"Schedule inventory: {inventory.flow_group_count} flow groups | "
+            f"{inventory.clock_count} clocks | {len(schedules)} distinct schedules"
+        )
+        self._print_report_separator()
+        print(
+            f"{self.REPORT_TITLE_SCHEDULE:<30} "
+            f"{self.REPORT_TITLE_FLOWS:>6} "
+            f"{self.REPORT_TITLE_ACTIVE:>6}   "
+            f"{self.REPORT_TITLE_SCHEDULE_CONFIG}"
+        )
+        self._print_report_separator()
+
+        for schedule in schedules:
+            print("")
+            print(
+                f"> {schedule.get_schedule_str():<28} "
+                f"{schedule.get_count():>6} "
+                f"{schedule.active_count:>6}   "
+                f"{schedule.get_human_description()}"
+            )
+            if len(schedule.expressions) > 1:
+                expressions_as_str = ", ".join(f"'{expression}'" for expression in sorted(schedule.expressions))
+                print(f"|---- [Expressions]: {expressions_as_str}")
+            if forecast:
+                self._print_forecast(forecast, [schedule.clock])
+            for flow_name in sorted(schedule.flow_names):
+                print(f"|- {flow_name}")
+        print("")
+
     def print_general_report(
         self,
         project_filters: list[str] = None,
         sort_by: str = None,
+        explain: bool = False,
+        snapshot_path: str = None,
+        forecast_runs: int = 0,
+        forecast_timezones: list[str] = None,
     ):
         if project_filters is None:
             project_filters = []
 
-        queries_to_execute = self._get_queries_to_execute(project_filters)
+        snapshot = None
+        if snapshot_path:
+            # the report only renders the latest flow of each flow group
+            snapshot = self.open_snapshot(snapshot_path, project_filters, latest_only=True)
 
-        flow_group_data_list = []
+        try:
+            if snapshot:
+                flow_groups = (
+                    FlowGroupObject(flow_group)
+                    for flow_group in self._iter_snapshot_flow_group_data(snapshot, project_filters)
+                )
+            else:
+                if explain:
+                    print(self.plan_flow_groups_fetch(project_filters, only_latest=True).explain())
+                    return
+                flow_groups = self.iter_flow_groups(project_filters, only_latest=True)
 
-        for query in queries_to_execute:
-            response = self.execute_raw_query(query)
-            flow_group_data_from_response = response.get('data', {}).get('flow_group', {})
-            flow_group_data_list.append(flow_group_data_from_response)
+            self._print_general_report_flow_groups(flow_groups, sort_by, forecast_runs, forecast_timezones)
+        finally:
+            if snapshot:
+                snapshot.close()
 
+    def _print_general_report_flow_groups(
+        self,
+        flow_groups,
+        sort_by: str = None,
+        forecast_runs: int = 0,
+        forecast_timezones: list[str] = None,
+    ):
         self._print_common_report_header(sort_by)
 
         flow_groups_by_project = {}  # type: Dict[str, List[FlowGroupObject]]
 
-        for flow_group_data in flow_group_data_list:
-            for flow_group in flow_group_data:
-                flow_group_instance = FlowGroupObject(flow_group)
+        for flow_group_instance in flow_groups:
 
-                proj_name = flow_group_instance.project.name
+            proj_name = flow_group_instance.project.name
+
+            if proj_name in flow_groups_by_project.keys():
+                flow_groups_by_project[proj_name].append(flow_group_instance)
+            else:
+                flow_groups_by_project[proj_name] = []
+                flow_groups_by_project[proj_name].append(flow_group_instance)
 
-                if proj_name in flow_groups_by_project.keys():
-                    flow_groups_by_project[proj_name].append(flow_group_instance)
-                else:
-                    flow_groups_by_project[proj_name] = []
-                    flow_groups_by_project[proj_name].append(flow_group_instance)
+        forecast = None
+        if forecast_runs:
+            forecast = ScheduleForecast(forecast_timezones or FORECAST_TIMEZONES, runs=forecast_runs)
+            for flow_group_objects in flow_groups_by_project.values():
+                for flow_group_object in flow_group_objects:
+                    forecast.add_clocks(flow_group_object.schedules)
 
         for flow_group_name, flow_group_objects in flow_groups_by_project.items():
             print("")
@@ -595,10 +1266,19 @@ class PrefectCloudApiModel(object):
                             f"{params_as_str:<100}"
                             f"{schedule.get_human_description()}"
                         )
+                if forecast:
+                    self._print_forecast(forecast, flow_group_object.schedules)
                 if has_parameters:
                     print("|")
         print("")
 
+    def _print_forecast(self, forecast: ScheduleForecast, clocks: List[ScheduleClock]):
+        for timezone_name, next_runs in forecast.get_next_runs(clocks).items():
+            if not next_runs:
+                continue
+            next_runs_as_str = ", ".join(next_run.strftime(FORECAST_STR_FMT) for next_run in next_runs)
+            print(f"|---- [Next runs - {timezone_name}]: {next_runs_as_str}")
+
     def _print_common_report_header(self, sort_value=""):
         # workflow name
         workflow_name_title = self.REPORT_TITLE_WORKFLOW
@@ -625,43 +1305,292 @@ class PrefectCloudApiModel(object):
         )
         self._print_report_separator()
 
+    def write_snapshot(self, snapshot_path: str, project_filters: list[str] = None) -> int:
+        """
+        Fetches the flow groups of the general report and writes them
+        into a binary snapshot, to be loaded later by the reports.
+        """
+        fetch_plan = self.plan_flow_groups_fetch(project_filters)
+        return TenantSnapshot.write(
+            snapshot_path,
+            self._iter_unique_flow_group_data(fetch_plan),
+            self.SNAPSHOT_QUERY_SHAPE,
+            project_filters=project_filters,
+            latest_only=fetch_plan.latest_only,
+        )
+
+    def open_snapshot(
+        self,
+        snapshot_path: str,
+        project_filters: list[str] = None,
+        latest_only: bool = False,
+    ) -> TenantSnapshot or None:
+        """
+        Opens a snapshot holding the flow groups matched by the project
+        filters. Returns None (the caller fetches from the cloud) when
+        it is missing, outdated or partial: written with other project
+        filters, or with the latest flow versions only while
+        ``latest_only`` is not set.
+        """
+        if not os.path.exists(snapshot_path):
+            logger.warning(f"snapshot not found, fetching from cloud: {snapshot_path}")
+            return None
+        try:
+            snapshot = TenantSnapshot(snapshot_path, self.SNAPSHOT_QUERY_SHAPE)
+        except SnapshotVersionError as error:
+            logger.warning(f"snapshot invalidated, fetching from cloud: {error}")
+            return None
+
+        if not snapshot.covers(project_filters):
+            written_filters = ", ".join(snapshot.project_filters)
+            logger.warning(
+                f"snapshot written for project filters ({written_filters}) "
+                f"does not cover the requested ones, fetching from cloud: {snapshot_path}"
+            )
+            snapshot.close()
+            return None
+        if snapshot.latest_only and not latest_only:
+            logger.warning(f"snapshot holds the latest flow versions only, fetching from cloud: {snapshot_path}")
+            snapshot.close()
+            return None
+        return snapshot
+
+    def _iter_snapshot_flow_group_data(self, snapshot: TenantSnapshot, project_filters: list[str] = None):
+        # project filters are matched against the project name column
+        # only, so filtered out flow groups are never decoded.
+        project_filters = [project_filter.lower() for project_filter in project_filters or []]
+        for index in range(len(snapshot)):
+            if project_filters:
+                project_name = (snapshot.get_project_name(index) or "").lower()
+                if not any(project_filter in project_name for project_filter in project_filters):
+                    continue
+            yield snapshot.get_raw(index)
+
+    def iter_flow_groups(
+        self,
+        project_filters: list[str] = None,
+        fields: list[str] = None,
+        only_latest: bool = False,
+        schedule_only: bool = False,
+    ):
+        """
+        Yields a FlowGroupObject for each flow group of the projects
+        matching the filters (all the projects when none is given).
+
+        - fields: extra flow group fields to query (e.g. ``settings``),
+          available on ``FlowGroupObject.extra_fields``.
+        - only_latest: only the latest flow version of each flow group
+          is fetched.
+        - schedule_only: only flow groups with a schedule-active flow
+          version.
+
+        Flow groups are fetched lazily following the fetch plan (see
+        ``plan_flow_groups_fetch``) and each one is yielded once. Every
+        flow version is fetched unless ``only_latest`` is set, whatever
+        the tenant size. Stopping the iteration cancels the pages not
+        requested yet.
+        """
+        fetch_plan = self.plan_flow_groups_fetch(project_filters, schedule_only, only_latest)
+        for flow_group in self._iter_unique_flow_group_data(fetch_plan, fields):
+            yield FlowGroupObject(flow_group)
+
+    def _iter_unique_flow_group_data(self, fetch_plan: FetchPlan, fields: list[str] = None):
+        # overlapping project filters (e.g. "prod" and "prod-a") match
+        # the same flow groups more than once
+        seen_flow_group_ids = set()
+        for flow_group_page in self._fetch_flow_group_data(fetch_plan, fields):
+            for flow_group in flow_group_page:
+                if flow_group.get("id") in seen_flow_group_ids:
+                    continue
+                seen_flow_group_ids.add(flow_group.get("id"))
+                yield flow_group
+
+    def plan_flow_groups_fetch(
+        self,
+        project_filters: list[str] = None,
+        schedule_only: bool = False,
+        only_latest: bool = False,
+    ) -> FetchPlan:
+        """
+        Runs the aggregate probes for the given project filters and selects
+        the fetch strategy from the estimated payload size. Plans are
+        reused for ``FETCH_PLAN_TTL`` seconds.
+        """
+        plan_key = (tuple(project_filters or []), schedule_only, only_latest)
+        planned_at, fetch_plan = self._fetch_plans.get(plan_key, (None, None))
+        if fetch_plan and time.monotonic() - planned_at < self.FETCH_PLAN_TTL:
+            return fetch_plan
+
+        summary = self.query_summary(project_filters)
+        fetch_plan = FetchPlanner().plan(
+            summary,
+            project_filters,
+            schedule_only=schedule_only,
+            only_latest=only_latest,
+        )
+        logger.info(f"fetch plan: {fetch_plan}")
+        self._fetch_plans[plan_key] = (time.monotonic(), fetch_plan)
+        return fetch_plan
+
+    def _fetch_flow_group_data(self, fetch_plan: FetchPlan, fields: list[str] = None):
+        """
+        Yields lists of raw flow group data following the given plan.
+        Per-project plans request their pages concurrently, keeping at
+        most ``max_workers`` requests in flight, and yield them in the
+        order they were planned, so reports come out the same on every
+        run. Closing the generator cancels the pages not requested yet.
+        """
+        if not fetch_plan.is_per_project():
+            queries_to_execute = self._get_queries_to_execute(
+                fetch_plan.project_filters,
+                latest_only=fetch_plan.latest_only,
+                schedule_only=fetch_plan.schedule_only,
+                fields=fields,
+            )
+            for query in queries_to_execute:
+                response = self.execute_raw_query(query)
+                yield response.get('data', {}).get('flow_group', [])
+            return
+
+        # pages are planned from the probe counts. A last page coming
+        # back full (flow groups added since the probes) adds the next one.
+        pending_pages = deque()
+        last_offsets = {}  # type: Dict[str, int]
+        for project_name in fetch_plan.project_names:
+            project_count = fetch_plan.project_counts.get(project_name, 0)
+            if not project_count:
+                continue
+            offsets = [0]
+            if fetch_plan.page_size:
+                offsets = list(range(0, project_count, fetch_plan.page_size))
+            for offset in offsets:
+                pending_pages.append((project_name, offset))
+            last_offsets[project_name] = offsets[-1]
+
+        executor = ThreadPoolExecutor(max_workers=fetch_plan.max_workers)
+        # pages in flight, in the order they were requested
+        requested_pages = deque()
+        try:
+            while pending_pages or requested_pages:
+                while pending_pages and len(requested_pages) < fetch_plan.max_workers:
+                    project_name, offset = pending_pages.popleft()
+                    future = executor.submit(
+                        self._fetch_project_flow_group_page, fetch_plan, project_name, offset, fields
+                    )
+                    requested_pages.append((project_name, offset, future))
+
+                project_name, offset, future = requested_pages.popleft()
+                flow_group_page = future.result()
+                if (
+                    fetch_plan.page_size
+                    and offset == last_offsets[project_name]
+                    and len(flow_group_page) >= fetch_plan.page_size
+                ):
+                    last_offsets[project_name] = offset + fetch_plan.page_size
+                    pending_pages.appendleft((project_name, last_offsets[project_name]))
+                yield flow_group_page
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch_project_flow_group_page(
+        self,
+        fetch_plan: FetchPlan,
+        project_name: str,
+        offset: int,
+        fields: list[str] = None,
+    ) -> list[Dict]:
+        query = self._get_query_from_factory(
+            include_schedule_only=fetch_plan.schedule_only,
+            project_name=project_name,
+            latest_only=fetch_plan.latest_only,
+            limit=fetch_plan.page_size,
+            offset=offset,
+            fields=fields,
+        )
+        response = self.execute_raw_query(query)
+        return response.get('data', {}).get('flow_group', [])
+
     def _get_queries_to_execute(
         self,
         project_filters: list[str] = None,
+        latest_only: bool = False,
+        schedule_only: bool = False,
+        fields: list[str] = None,
     ) -> list[str]:
         queries_to_execute = []
 
         for project_filter in project_filters:
             query = self._get_query_from_factory(
                 project_filter=project_filter,
-                include_schedule_only=False
+                include_schedule_only=schedule_only,
+                latest_only=latest_only,
+                fields=fields,
             )
             queries_to_execute.append(query)
 
         if not project_filters:
             queries_to_execute.append(
-                self._get_query_from_factory(include_schedule_only=False)
+                self._get_query_from_factory(
+                    include_schedule_only=schedule_only,
+                    latest_only=latest_only,
+                    fields=fields,
+                )
             )
         return queries_to_execute
 
     def _get_query_from_factory(
         self,
         project_filter: str = None,
-        include_schedule_only: bool = False
+        include_schedule_only: bool = False,
+        project_name: str = None,
+        latest_only: bool = False,
+        limit: int = None,
+        offset: int = 0,
+        fields: list[str] = None,
     ) -> str:
 
         query = ""
 
+        if project_filter:
+            project_filter = escape_graphql_string(project_filter)
+        if project_name:
+            project_name = escape_graphql_string(project_name)
+
         if include_schedule_only:
             query = queries.Q_ALL_SCHEDULED_FLOWS
 
         if project_filter and include_schedule_only:
             query = queries.Q_ALL_SCHEDULED_FLOWS_WITH_PROJECT_FILTER
 
-        if project_filter and not include_schedule_only:
+        if not include_schedule_only:
+            # an empty project filter matches all the projects
             query = queries.Q_ALL_FLOW_GROUPS_WITH_PROJECT_FILTER
+            query = query.replace("$_PROJECT_NAME", project_filter or "")
+
+        if project_name and not include_schedule_only:
+            query = queries.Q_ALL_FLOW_GROUPS_WITH_PROJECT_NAME
+            query = query.replace("$_PROJECT_NAME", project_name)
+
+        if project_name and include_schedule_only:
+            query = queries.Q_ALL_SCHEDULED_FLOWS_WITH_PROJECT_NAME
+            query = query.replace("$_PROJECT_NAME", project_name)
 
         if project_filter:
             query = query.replace("$_PROJECT_NAME", project_filter)
 
+        flow_group_fields = FlowGroupObject.QUERIED_FIELDS + [
+            field for field in fields or [] if field not in FlowGroupObject.QUERIED_FIELDS
+        ]
+        query = query.replace("$_FLOW_GROUP_FIELDS", " ".join(flow_group_fields))
+
+        pagination = ""
+        if limit:
+            pagination = f"limit: {limit} offset: {offset}"
+        query = query.replace("$_PAGINATION", pagination)
+
+        flows_args = ""
+        if latest_only:
+            flows_args = "(order_by: {version: desc}, limit: 1)"
+        query = query.replace("$_FLOWS_ARGS", flows_args)
+
         return query
@@ -0,0 +1,104 @@
+import heapq
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from itertools import islice
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+from models.CronExpansion import get_cron_expansion
+
+
+@lru_cache(maxsize=None)
+def get_zone(timezone_name: str) -> ZoneInfo:
+    return ZoneInfo(timezone_name)
+
+
+def parse_timezone_names(value: str) -> List[str]:
+    """Comma separated timezone names, empty entries dropped."""
+    return [timezone_name.strip() for timezone_name in value.split(",") if timezone_name.strip()]
+
+
+def is_valid_timezone(timezone_name: str) -> bool:
+    try:
+        get_zone(timezone_name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return False
+    return True
+
+
+@lru_cache(maxsize=None)
+def get_fixed_offset_zone(offset: timedelta) -> timezone:
+    return timezone(offset)
+
+
+class ScheduleForecast(object):
+    """
+    Next ``runs`` fire times of cron clocks, converted into several
+    timezones.
+
+    Fire times are computed once per distinct (canonical) schedule,
+    clock timezone and start/end dates, and shared by every clock using
+    it. Clocks in an unknown timezone have no forecast. UTC offsets are resolved once per
+    timezone and UTC day: when the offset is the same at both ends of
+    the day it applies to every fire time of that day, and only days
+    holding a DST transition are converted one fire time at a time.
+    """
+
+    def __init__(self, timezones: List[str], runs: int = 3, now: datetime = None):
+        self.timezones = timezones
+        self.zones = [get_zone(timezone_name) for timezone_name in timezones]
+        self.runs = runs
+        self.now = now or datetime.now(timezone.utc)
+        self._fire_times = {}  # type: Dict[tuple, List[datetime]]
+        self._day_offsets = {}  # type: Dict[Tuple[str, object], Tuple[timedelta, timedelta]]
+
+    def add_clocks(self, clocks):
+        """Computes the fire times of all the distinct schedules of the clocks in one pass."""
+        for clock in clocks:
+            if clock.is_cron():
+                self._get_fire_times_utc(clock)
+
+    def _get_fire_times_utc(self, clock) -> List[datetime]:
+        if clock.zone is None:
+            return []
+        cron_expansion = get_cron_expansion(clock.value)
+        schedule_key = (cron_expansion.canonical_value, clock.timezone, clock.start_date, clock.end_date)
+        if schedule_key not in self._fire_times:
+            self._fire_times[schedule_key] = cron_expansion.get_next_fire_times(
+                self.now, self.runs, clock.zone, clock.start_date, clock.end_date
+            )
+        return self._fire_times[schedule_key]
+
+    def get_next_runs_utc(self, clocks) -> List[datetime]:
+        """Next fire times (UTC) of all the cron clocks of a flow group, merged."""
+        fire_times = [self._get_fire_times_utc(clock) for clock in clocks if clock.is_cron()]
+        if not fire_times:
+            return []
+        return list(islice(heapq.merge(*fire_times), self.runs))
+
+    def get_next_runs(self, clocks) -> Dict[str, List[datetime]]:
+        """Next fire times of the clocks, per configured timezone."""
+        next_runs_utc = self.get_next_runs_utc(clocks)
+        next_runs = {}
+        for timezone_name, zone in zip(self.timezones, self.zones):
+            next_runs[timezone_name] = [
+                self._convert(fire_time, timezone_name, zone) for fire_time in next_runs_utc
+            ]
+        return next_runs
+
+    def _convert(self, fire_time: datetime, timezone_name: str, zone: ZoneInfo) -> datetime:
+        day = fire_time.date()
+        day_key = (timezone_name, day)
+        if day_key not in self._day_offsets:
+            day_start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+            self._day_offsets[day_key] = (
+                day_start.astimezone(zone).utcoffset(),
+                (day_start + timedelta(days=1, microseconds=-1)).astimezone(zone).utcoffset(),
+            )
+        start_offset, end_offset = self._day_offsets[day_key]
+        if start_offset != end_offset:
+            return fire_time.astimezone(zone)
+        return fire_time.astimezone(get_fixed_offset_zone(start_offset))
@@ -0,0 +1,80 @@
+from typing import Dict
+from typing import List
+from typing import Set
+
+from models.CronExpansion import get_cron_expansion
+
+
+class InventorySchedule(object):
+    """A distinct schedule and the flow groups configured with it."""
+
+    def __init__(self, clock):
+        # representative clock: description and next run are computed
+        # from it, once for all the flow groups sharing the schedule.
+        self.clock = clock
+        self.canonical_value = clock.get_canonical_value() if clock.is_cron() else clock.type
+        # cron clocks are evaluated in the timezone of their start date
+        self.timezone = clock.timezone if clock.is_cron() else None
+        self.expressions = set()  # type: Set[str]
+        self.flow_names = []  # type: List[str]
+        self.active_count = 0
+
+    def get_count(self) -> int:
+        return len(self.flow_names)
+
+    def get_schedule_str(self) -> str:
+        if self.timezone is None:
+            return self.canonical_value
+        return f"{self.canonical_value} {self.clock.get_timezone_str()}"
+
+    def get_human_description(self) -> str:
+        return self.clock.get_human_description()
+
+
+class ScheduleInventory(object):
+    """
+    Groups flow groups by equivalent schedule, tenant-wide.
+
+    Cron clocks are keyed by their expanded field sets and day rule
+    (see CronExpansion) and by their timezone, so equivalent expressions
+    evaluated in the same timezone land on the same schedule. Other
+    clock types are grouped by type.
+    """
+
+    def __init__(self):
+        self.schedules = {}  # type: Dict[tuple, InventorySchedule]
+        self.flow_group_count = 0
+        self.clock_count = 0
+
+    def add_flow_group(self, flow_group):
+        latest_flow = flow_group.get_latest_flow()
+        flow_name = f"{latest_flow.get_versioned_name()} ({flow_group.project.name})"
+
+        self.flow_group_count += 1
+        schedule_keys = set()
+        for clock in flow_group.schedules:
+            self.clock_count += 1
+            if clock.is_cron():
+                schedule_key = (get_cron_expansion(clock.value).canonical_key, clock.timezone)
+            else:
+                schedule_key = (clock.type,)
+
+            if schedule_key not in self.schedules:
+                self.schedules[schedule_key] = InventorySchedule(clock)
+            schedule = self.schedules[schedule_key]
+            schedule.expressions.add(clock.value if clock.is_cron() else clock.type)
+
+            # a schedule repeated on several clocks (e.g. with different
+            # parameters) counts the flow group once
+            if schedule_key in schedule_keys:
+                continue
+            schedule_keys.add(schedule_key)
+            schedule.flow_names.append(flow_name)
+            if latest_flow.is_schedule_active():
+                schedule.active_count += 1
+
+    def get_schedules(self) -> List[InventorySchedule]:
+        return sorted(
+            self.schedules.values(),
+            key=lambda _schedule: (-_schedule.get_count(), _schedule.canonical_value, _schedule.timezone or ""),
+        )
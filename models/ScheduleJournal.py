@@ -0,0 +1,100 @@
+import json
+import os
+import time
+
+from typing import List
+from typing import Set
+
+
+class ScheduleOperation(object):
+    """A single schedule mutation, identified by its kind, target and payload."""
+
+    KIND_ACTIVATE = "activate"
+    KIND_SET_CRON = "set_cron"
+
+    def __init__(self, kind: str, target_id: str, target_name: str = None, cron: str = None):
+        self.kind = kind
+        self.target_id = target_id
+        self.target_name = target_name
+        self.cron = cron
+
+    def get_key(self) -> str:
+        return f"{self.kind}:{self.target_id}:{self.cron or ''}"
+
+    def to_dict(self):
+        return {
+            "key": self.get_key(),
+            "kind": self.kind,
+            "target_id": self.target_id,
+            "target_name": self.target_name,
+            "cron": self.cron,
+        }
+
+    def __str__(self):
+        target = self.target_name or self.target_id
+        if self.cron:
+            return f"{self.kind} | {target} | {self.cron}"
+        return f"{self.kind} | {target}"
+
+
+class ScheduleJournal(object):
+    """
+    Append-only journal (JSON lines) of the schedule operations planned,
+    completed, skipped and failed.
+
+    Operations completed or skipped by a previous execution are loaded
+    when the journal is opened, so a rerun after a crash or a timeout
+    only sends the pending ones. A truncated last line (written while
+    crashing) is ignored.
+    """
+
+    EVENT_PLANNED = "planned"
+    EVENT_COMPLETED = "completed"
+    EVENT_SKIPPED = "skipped"
+    EVENT_FAILED = "failed"
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done_keys = set()  # type: Set[str]
+        ends_with_newline = self._load()
+        self._file = open(path, "a", encoding="utf-8")
+        # a truncated last line is ended, so the next entry is not merged into it
+        if not ends_with_newline:
+            self._file.write("\n")
+
+    def _load(self) -> bool:
+        """Loads the done operations. Returns whether the journal ends with a complete line."""
+        if not os.path.exists(self.path):
+            return True
+        line = "\n"
+        with open(self.path, "r", encoding="utf-8", errors="replace") as journal_file:
+            for line in journal_file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if not isinstance(entry, dict):
+                    continue
+                if entry.get("event") in (self.EVENT_COMPLETED, self.EVENT_SKIPPED):
+                    self.done_keys.add(entry.get("key"))
+        return line.endswith("\n")
+
+    def is_done(self, operation: ScheduleOperation) -> bool:
+        return bool(operation.get_key() in self.done_keys)
+
+    def record(self, event: str, operations: List[ScheduleOperation], reason: str = None):
+        for operation in operations:
+            entry = operation.to_dict()
+            entry["event"] = event
+            entry["time"] = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+            if reason:
+                entry["reason"] = reason
+            self._file.write(json.dumps(entry) + "\n")
+            if event in (self.EVENT_COMPLETED, self.EVENT_SKIPPED):
+                self.done_keys.add(operation.get_key())
+        # every batch is persisted before the next one is sent
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
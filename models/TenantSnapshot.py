@@ -0,0 +1,318 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from typing import Dict
+from typing import Iterable
+from typing import List
+
+
+class SnapshotVersionError(Exception):
+    pass
+
+
+class TenantSnapshot(object):
+    """
+    Binary snapshot of flow group data, opened through mmap.
+
+    Layout (native byte order, recorded in the header)::
+
+        header | metadata | group columns | flow columns | clock columns | string offsets | string blob
+
+    Every column is a contiguous uint32 array, strings are referenced by
+    their index on the string table. Clocks are stored whole, as JSON
+    strings, so every clock field (start and end dates, intervals...)
+    is kept. Columns are exposed as memoryviews
+    over the mapped file, so reading a flow group only touches the pages
+    holding its own values.
+
+    The header stores a hash of the query shape the data was fetched
+    with. Opening a snapshot written with another format version or
+    query shape raises SnapshotVersionError.
+
+    The metadata (JSON) records the project filters the data was
+    fetched with and whether only the latest flow version of each flow
+    group was kept, so readers can tell a partial snapshot apart (see
+    ``covers``).
+    """
+
+    MAGIC = b"PGCSNAP\0"
+    FORMAT_VERSION = 3
+
+    # magic, format version, byte order, shape hash, groups, flows, clocks, strings, metadata size
+    HEADER_FORMAT = "=8sIB32sIIIII"
+    HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+    GROUP_COLUMNS = [
+        "name", "id", "labels", "flow_start", "flow_count", "clock_start", "clock_count",
+    ]
+    FLOW_COLUMNS = [
+        "id", "name", "version", "is_schedule_active", "project_id", "project_name",
+    ]
+    CLOCK_COLUMNS = [
+        "clock",
+    ]
+
+    NULL_STRING = 0xFFFFFFFF
+
+    def __init__(self, path: str, query_shape: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise SnapshotVersionError(f"empty snapshot: {path}")
+        self._view = memoryview(self._mmap)
+        try:
+            self._read_header(query_shape)
+        except SnapshotVersionError:
+            self._view.release()
+            self._mmap.close()
+            self._file.close()
+            raise
+
+    @classmethod
+    def get_shape_hash(cls, query_shape: str) -> bytes:
+        shape = f"{cls.FORMAT_VERSION}:{' '.join(query_shape.split())}"
+        return hashlib.sha256(shape.encode("utf-8")).digest()
+
+    def _read_header(self, query_shape: str):
+        if len(self._view) < self.HEADER_SIZE:
+            raise SnapshotVersionError(f"truncated snapshot: {self.path}")
+
+        magic, version, byte_order, shape_hash, n_groups, n_flows, n_clocks, n_strings, metadata_size = (
+            struct.unpack_from(self.HEADER_FORMAT, self._view, 0)
+        )
+        if magic != self.MAGIC or version != self.FORMAT_VERSION:
+            raise SnapshotVersionError(f"unsupported snapshot format: {self.path}")
+        if byte_order != self._byte_order_flag():
+            raise SnapshotVersionError(f"snapshot written on another byte order: {self.path}")
+        if shape_hash != self.get_shape_hash(query_shape):
+            raise SnapshotVersionError(f"snapshot query shape changed: {self.path}")
+
+        self.n_groups = n_groups
+        self.n_flows = n_flows
+        self.n_clocks = n_clocks
+        self.n_strings = n_strings
+
+        offset = self.HEADER_SIZE
+        metadata = json.loads(str(self._view[offset:offset + metadata_size], "utf-8"))
+        self.project_filters = metadata.get("project_filters", [])
+        self.latest_only = bool(metadata.get("latest_only"))
+        offset += metadata_size
+        self._groups, offset = self._map_columns(self.GROUP_COLUMNS, n_groups, offset)
+        self._flows, offset = self._map_columns(self.FLOW_COLUMNS, n_flows, offset)
+        self._clocks, offset = self._map_columns(self.CLOCK_COLUMNS, n_clocks, offset)
+
+        offset = self._align(offset, 8)
+        strings_offsets_size = (n_strings + 1) * 8
+        self._string_offsets = self._view[offset:offset + strings_offsets_size].cast("Q")
+        self._string_blob_start = offset + strings_offsets_size
+
+    def _map_columns(self, column_names: List[str], count: int, offset: int):
+        columns = {}
+        for column_name in column_names:
+            offset = self._align(offset, 4)
+            columns[column_name] = self._view[offset:offset + count * 4].cast("I")
+            offset += count * 4
+        return columns, offset
+
+    def _get_string(self, string_index: int):
+        if string_index == self.NULL_STRING:
+            return None
+        start = self._string_blob_start + self._string_offsets[string_index]
+        end = self._string_blob_start + self._string_offsets[string_index + 1]
+        return str(self._view[start:end], "utf-8")
+
+    def get_project_name(self, index: int) -> str:
+        """Project name of a flow group, read without decoding the flow group."""
+        if not self._groups["flow_count"][index]:
+            return None
+        first_flow = self._groups["flow_start"][index]
+        return self._get_string(self._flows["project_name"][first_flow])
+
+    def get_raw(self, index: int) -> Dict:
+        """Flow group data with the same shape as the flow_group query response."""
+        if not 0 <= index < self.n_groups:
+            raise IndexError(index)
+
+        groups = self._groups
+        flows = []
+        flow_start = groups["flow_start"][index]
+        for flow_index in range(flow_start, flow_start + groups["flow_count"][index]):
+            flows.append({
+                "id": self._get_string(self._flows["id"][flow_index]),
+                "name": self._get_string(self._flows["name"][flow_index]),
+                "version": self._flows["version"][flow_index],
+                "is_schedule_active": bool(self._flows["is_schedule_active"][flow_index]),
+                "project": {
+                    "id": self._get_string(self._flows["project_id"][flow_index]),
+                    "name": self._get_string(self._flows["project_name"][flow_index]),
+                },
+            })
+
+        clocks = []
+        clock_start = groups["clock_start"][index]
+        for clock_index in range(clock_start, clock_start + groups["clock_count"][index]):
+            clocks.append(json.loads(self._get_string(self._clocks["clock"][clock_index])))
+
+        labels = self._get_string(groups["labels"][index])
+        return {
+            "name": self._get_string(groups["name"][index]),
+            "id": self._get_string(groups["id"][index]),
+            "labels": json.loads(labels) if labels else [],
+            "schedule": {"clocks": clocks} if clocks else None,
+            "flows": flows,
+        }
+
+    def covers(self, project_filters: List[str] = None) -> bool:
+        """
+        Whether the snapshot holds every flow group matched by the given
+        project filters. A project matching a filter also matches any
+        written filter contained into it, so each filter must contain
+        one of the filters the snapshot was written with.
+        """
+        if not self.project_filters:
+            return True
+        written_filters = [written_filter.lower() for written_filter in self.project_filters]
+        return bool(project_filters) and all(
+            any(written_filter in project_filter.lower() for written_filter in written_filters)
+            for project_filter in project_filters
+        )
+
+    def iter_raw(self):
+        for index in range(self.n_groups):
+            yield self.get_raw(index)
+
+    def __len__(self):
+        return self.n_groups
+
+    def close(self):
+        # release the column views before closing the mapping
+        self._groups = self._flows = self._clocks = None
+        self._string_offsets.release()
+        self._string_offsets = None
+        self._view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @staticmethod
+    def _align(offset: int, alignment: int) -> int:
+        return (offset + alignment - 1) // alignment * alignment
+
+    @staticmethod
+    def _byte_order_flag() -> int:
+        return 1 if sys.byteorder == "little" else 0
+
+    @classmethod
+    def write(
+        cls,
+        path: str,
+        flow_groups: Iterable[Dict],
+        query_shape: str,
+        project_filters: List[str] = None,
+        latest_only: bool = False,
+    ) -> int:
+        """
+        Writes raw flow group data (as returned by the flow_group query)
+        into a snapshot file. The file is replaced atomically.
+        Returns the number of flow groups written.
+        """
+        string_table = {}  # type: Dict[str, int]
+        strings = []  # type: List[bytes]
+
+        def add_string(value) -> int:
+            if value is None:
+                return cls.NULL_STRING
+            value = str(value)
+            if value not in string_table:
+                string_table[value] = len(strings)
+                strings.append(value.encode("utf-8"))
+            return string_table[value]
+
+        groups = {column_name: array("I") for column_name in cls.GROUP_COLUMNS}
+        flows = {column_name: array("I") for column_name in cls.FLOW_COLUMNS}
+        clocks = {column_name: array("I") for column_name in cls.CLOCK_COLUMNS}
+
+        for flow_group in flow_groups:
+            groups["name"].append(add_string(flow_group.get("name")))
+            groups["id"].append(add_string(flow_group.get("id")))
+            labels = flow_group.get("labels")
+            groups["labels"].append(add_string(json.dumps(labels) if labels else None))
+
+            flow_group_flows = sorted(
+                flow_group.get("flows", []),
+                key=lambda _flow: int(_flow.get("version")),
+                reverse=True,
+            )
+            groups["flow_start"].append(len(flows["id"]))
+            groups["flow_count"].append(len(flow_group_flows))
+            for flow in flow_group_flows:
+                project = flow.get("project") or {}
+                flows["id"].append(add_string(flow.get("id")))
+                flows["name"].append(add_string(flow.get("name")))
+                flows["version"].append(int(flow.get("version")))
+                flows["is_schedule_active"].append(int(bool(flow.get("is_schedule_active"))))
+                flows["project_id"].append(add_string(project.get("id")))
+                flows["project_name"].append(add_string(project.get("name")))
+
+            schedule = flow_group.get("schedule") or {}
+            schedule_clocks = schedule.get("clocks", [])
+            groups["clock_start"].append(len(clocks["clock"]))
+            groups["clock_count"].append(len(schedule_clocks))
+            for clock in schedule_clocks:
+                clocks["clock"].append(add_string(json.dumps(clock, sort_keys=True)))
+
+        n_groups = len(groups["id"])
+        metadata = json.dumps({
+            "project_filters": list(project_filters or []),
+            "latest_only": latest_only,
+        }).encode("utf-8")
+        header = struct.pack(
+            cls.HEADER_FORMAT,
+            cls.MAGIC,
+            cls.FORMAT_VERSION,
+            cls._byte_order_flag(),
+            cls.get_shape_hash(query_shape),
+            n_groups,
+            len(flows["id"]),
+            len(clocks["clock"]),
+            len(strings),
+            len(metadata),
+        )
+
+        string_offsets = array("Q", [0])
+        for string in strings:
+            string_offsets.append(string_offsets[-1] + len(string))
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as snapshot_file:
+            snapshot_file.write(header)
+            snapshot_file.write(metadata)
+            for columns in (groups, flows, clocks):
+                for column in columns.values():
+                    cls._write_padding(snapshot_file, 4)
+                    snapshot_file.write(column.tobytes())
+            cls._write_padding(snapshot_file, 8)
+            snapshot_file.write(string_offsets.tobytes())
+            for string in strings:
+                snapshot_file.write(string)
+        os.replace(tmp_path, path)
+
+        return n_groups
+
+    @classmethod
+    def _write_padding(cls, snapshot_file, alignment: int):
+        position = snapshot_file.tell()
+        snapshot_file.write(b"\0" * (cls._align(position, alignment) - position))
@@ -3,3 +3,10 @@ from .common import *
 from .schedule import Q_ALL_SCHEDULED_FLOWS
 from .schedule import Q_ALL_SCHEDULED_CONFIGURATIONS
 from .schedule import Q_ALL_SCHEDULED_FLOWS_WITH_PROJECT_FILTER
+from .schedule import Q_ALL_SCHEDULED_FLOWS_WITH_PROJECT_NAME
+
+from .aggregate import Q_PROJECT_NAMES_WITH_PROJECT_FILTER
+from .aggregate import Q_PROJECT_SUMMARY_BLOCK
+from .aggregate import Q_AGGREGATE_SUMMARY
+
+from .flow_run import Q_FLOW_RUNS_BY_FLOW_IDS_IN_WINDOW
@@ -0,0 +1,51 @@
+Q_PROJECT_NAMES_WITH_PROJECT_FILTER = """
+{
+  project(
+    where: { name: { _ilike: "%$_PROJECT_NAME%" } }
+    order_by: {name: asc}
+  ) {
+    id
+    name
+  }
+}
+"""
+
+# aliased aggregate block for a single project.
+# Several of these blocks are joined into one query document so
+# all the project counts are resolved in a single round-trip.
+Q_PROJECT_SUMMARY_BLOCK = """
+  $_ALIAS_flow_groups: flow_group_aggregate(
+    where: {
+      flows: {
+        project: { name: { _eq: "$_PROJECT_NAME" } }
+      }
+    }
+  ) { aggregate { count } }
+  $_ALIAS_schedule_active: flow_group_aggregate(
+    where: {
+      flows: {
+        is_schedule_active: { _eq: true }
+        project: { name: { _eq: "$_PROJECT_NAME" } }
+      }
+    }
+  ) { aggregate { count } }
+  $_ALIAS_cron_clocks: flow_group_aggregate(
+    where: {
+      schedule: { _contains: { clocks: [{ type: "CronClock" }] } }
+      flows: {
+        project: { name: { _eq: "$_PROJECT_NAME" } }
+      }
+    }
+  ) { aggregate { count } }
+  $_ALIAS_flows: flow_aggregate(
+    where: {
+      project: { name: { _eq: "$_PROJECT_NAME" } }
+    }
+  ) { aggregate { count } }
+"""
+
+Q_AGGREGATE_SUMMARY = """
+{
+$_SUMMARY_BLOCKS
+}
+"""
@@ -7,13 +7,28 @@ Q_ALL_FLOW_GROUPS_WITH_PROJECT_FILTER = """
         project: { name: { _ilike: "%$_PROJECT_NAME%" } }
       }
     }
-    order_by: {created: desc}
+    order_by: [{created: desc}, {id: asc}]
+    $_PAGINATION
   ) {
-    name
-    id
-    labels
-    schedule
-    flows { id name version is_schedule_active project { id name } }
+    $_FLOW_GROUP_FIELDS
+    flows$_FLOWS_ARGS { id name version is_schedule_active project { id name } }
+  }
+}
+"""
+
+Q_ALL_FLOW_GROUPS_WITH_PROJECT_NAME = """
+{
+  flow_group(
+    where: {
+      flows: {
+        project: { name: { _eq: "$_PROJECT_NAME" } }
+      }
+    }
+    order_by: [{created: desc}, {id: asc}]
+    $_PAGINATION
+  ) {
+    $_FLOW_GROUP_FIELDS
+    flows$_FLOWS_ARGS { id name version is_schedule_active project { id name } }
   }
 }
 """
@@ -59,3 +74,42 @@ mutation {
   }
 }
 """
+
+# aliased mutation fields, joined into a single M_BATCH_MUTATION document
+M_ACTIVATE_SCHEDULE_FIELD = """
+  $_ALIAS: set_schedule_active(
+    input: {
+      flow_id: "$_FLOW_ID"
+    }
+  ) {
+    success
+  }
+"""
+
+M_SETUP_CRON_SCHEDULE_FIELD = """
+  $_ALIAS: set_flow_group_schedule(
+    input: {
+      flow_group_id: "$_FLOW_GROUP_ID",
+      cron_clocks: [{cron: "$_FLOW_CRON"}]
+    }
+  ) {
+    success
+  }
+"""
+
+M_BATCH_MUTATION = """
+mutation {
+$_MUTATION_FIELDS
+}
+"""
+
+Q_FLOW_GROUP_SCHEDULES_BY_IDS = """
+{
+  flow_group(
+    where: { id: { _in: [$_FLOW_GROUP_IDS] } }
+  ) {
+    id
+    schedule
+  }
+}
+"""
@@ -0,0 +1,18 @@
+Q_FLOW_RUNS_BY_FLOW_IDS_IN_WINDOW = """
+{
+  flow_run(
+    where: {
+      flow_id: { _in: [$_FLOW_IDS] }
+      scheduled_start_time: { _gte: "$_WINDOW_START", _lt: "$_WINDOW_END" }
+    }
+    order_by: [{scheduled_start_time: asc}, {id: asc}]
+    limit: $_LIMIT
+    offset: $_OFFSET
+  ) {
+    id
+    flow_id
+    state
+    scheduled_start_time
+  }
+}
+"""
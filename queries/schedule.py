@@ -7,13 +7,11 @@ Q_ALL_SCHEDULED_FLOWS = """
         is_schedule_active: { _eq: true }
       }
     }
-    order_by: {created: desc}
+    order_by: [{created: desc}, {id: asc}]
+    $_PAGINATION
   ) {
-    name
-    id
-    labels
-    schedule
-    flows { id name version is_schedule_active project { id name } }
+    $_FLOW_GROUP_FIELDS
+    flows$_FLOWS_ARGS { id name version is_schedule_active project { id name } }
   }
 }
 """
@@ -27,13 +25,29 @@ Q_ALL_SCHEDULED_FLOWS_WITH_PROJECT_FILTER = """
         project: { name: { _ilike: "%$_PROJECT_NAME%" } }
       }
     }
-    order_by: {created: desc}
+    order_by: [{created: desc}, {id: asc}]
+    $_PAGINATION
   ) {
-    name
-    id
-    labels
-    schedule
-    flows { id name version is_schedule_active project { id name } }
+    $_FLOW_GROUP_FIELDS
+    flows$_FLOWS_ARGS { id name version is_schedule_active project { id name } }
+  }
+}
+"""
+
+Q_ALL_SCHEDULED_FLOWS_WITH_PROJECT_NAME = """
+{
+  flow_group(
+    where: {
+      flows: {
+        is_schedule_active: { _eq: true }
+        project: { name: { _eq: "$_PROJECT_NAME" } }
+      }
+    }
+    order_by: [{created: desc}, {id: asc}]
+    $_PAGINATION
+  ) {
+    $_FLOW_GROUP_FIELDS
+    flows$_FLOWS_ARGS { id name version is_schedule_active project { id name } }
   }
 }
 """
@@ -44,13 +58,11 @@ Q_ALL_SCHEDULED_CONFIGURATIONS = """
     where: {
       schedule: { _has_keys_any: "clocks" }
     }
-    order_by: {created: desc}
+    order_by: [{created: desc}, {id: asc}]
+    $_PAGINATION
   ) {
-    name
-    id
-    labels
-    schedule
-    flows { id name version is_schedule_active project { id name } }
+    $_FLOW_GROUP_FIELDS
+    flows$_FLOWS_ARGS { id name version is_schedule_active project { id name } }
   }
 }
 """
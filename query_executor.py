@@ -1,8 +1,16 @@
 import argparse
+import logging
+import time
+from datetime import datetime, timezone
 
 from decouple import config
 
+from models.GraphQlTransport import PrefectClientTransport
+from models.GraphQlTransport import RecordingTransport
+from models.GraphQlTransport import ReplayTransport
+from models.LatencyControl import ResilientTransport
 from models.PrefectCloudApiModel import PrefectCloudApiModel
+from models.ScheduleForecast import is_valid_timezone, parse_timezone_names
 
 
 # ---------------
@@ -55,6 +63,238 @@ def main():
             "This is the report with most details set."
         ),
     )
+    parser.add_argument(
+        "-m",
+        "--print-summary",
+        action="store_true",
+        required=False,
+        help=(
+            "Prints a summary with counts per project only: flow groups, "
+            "schedule active flow groups, cron configured flow groups and flow versions. "
+            "Counts are resolved server-side, no flow group data is downloaded."
+        ),
+    )
+    parser.add_argument(
+        "-f",
+        "--print-flow-runs",
+        action="store_true",
+        required=False,
+        help=(
+            "Prints upcoming, late and missing flow runs of the schedule active workflows "
+            "within a time window around now, with the backlog per project."
+        ),
+    )
+    parser.add_argument(
+        "--lookback-hours",
+        type=int,
+        default=24,
+        required=False,
+        metavar="HOURS",
+        help="hours in the past checked by the flow runs report (default: 24).",
+    )
+    parser.add_argument(
+        "--lookahead-hours",
+        type=int,
+        default=6,
+        required=False,
+        metavar="HOURS",
+        help="hours in the future checked by the flow runs report (default: 6).",
+    )
+    parser.add_argument(
+        "--now",
+        type=datetime.fromisoformat,
+        default=None,
+        required=False,
+        metavar="DATETIME",
+        help=(
+            "time the flow runs report is computed for, as an ISO datetime in UTC "
+            "(default: the current time, or the time recorded on the replayed cassette)."
+        ),
+    )
+    parser.add_argument(
+        "-a",
+        "--print-capacity-forecast",
+        action="store_true",
+        required=False,
+        help=(
+            "Prints the forecasted runs and peak concurrent runs per label set "
+            "(agents picking up the runs) from the cron schedules, "
+            "flagging label sets over the agent capacity."
+        ),
+    )
+    parser.add_argument(
+        "--horizon-hours",
+        type=int,
+        default=24,
+        required=False,
+        metavar="HOURS",
+        help="hours forecasted by the capacity forecast report (default: 24).",
+    )
+    parser.add_argument(
+        "--bucket-minutes",
+        type=int,
+        default=15,
+        required=False,
+        metavar="MINUTES",
+        help="size of the time buckets of the capacity forecast report (default: 15).",
+    )
+    parser.add_argument(
+        "--run-minutes",
+        type=int,
+        default=15,
+        required=False,
+        metavar="MINUTES",
+        help="expected duration of each run, used to compute concurrent runs (default: 15).",
+    )
+    parser.add_argument(
+        "--agent-capacity",
+        type=int,
+        default=10,
+        required=False,
+        metavar="RUNS",
+        help="max concurrent runs an agent is able to handle (default: 10).",
+    )
+    parser.add_argument(
+        "--activate-schedules",
+        action="store_true",
+        required=False,
+        help=(
+            "activates the schedule of the latest flow of every workflow in the projects "
+            "given with the project filter. Already active workflows are skipped."
+        ),
+    )
+    parser.add_argument(
+        "--journal",
+        default=None,
+        required=False,
+        metavar="JOURNAL_PATH",
+        help=(
+            "append-only journal of the schedule operations. Rerunning with the same journal "
+            "only sends the operations not completed yet."
+        ),
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=PrefectCloudApiModel.MUTATION_BATCH_SIZE,
+        required=False,
+        metavar="MUTATIONS",
+        help=f"mutations sent on each request (default: {PrefectCloudApiModel.MUTATION_BATCH_SIZE}).",
+    )
+    parser.add_argument(
+        "-i",
+        "--print-schedule-inventory",
+        action="store_true",
+        required=False,
+        help=(
+            "Prints the inventory of distinct schedules: equivalent cron expressions are "
+            "grouped together, with the number of workflows and the workflows using each one."
+        ),
+    )
+    parser.add_argument(
+        "--forecast-runs",
+        type=int,
+        default=0,
+        required=False,
+        metavar="RUNS",
+        help="adds the next RUNS runs of each schedule to the general and inventory reports.",
+    )
+    parser.add_argument(
+        "--forecast-timezones",
+        default=None,
+        required=False,
+        metavar="TIMEZONES",
+        help=(
+            "comma separated timezones the forecasted runs are shown in "
+            "(e.g. 'US/Central,America/Mexico_City,UTC'). "
+            "Defaults to FORECAST_TIMEZONES from the environment."
+        ),
+    )
+    parser.add_argument(
+        "-x",
+        "--explain",
+        action="store_true",
+        required=False,
+        help=(
+            "Prints the fetch plan selected for the general report "
+            "(counts, payload estimation and strategy) without fetching the report data."
+        ),
+    )
+    parser.add_argument(
+        "--snapshot",
+        default=None,
+        required=False,
+        metavar="SNAPSHOT_PATH",
+        help=(
+            "loads the general report from a binary snapshot file instead of the cloud. "
+            "Falls back to the cloud if the snapshot is missing or outdated."
+        ),
+    )
+    parser.add_argument(
+        "--write-snapshot",
+        default=None,
+        required=False,
+        metavar="SNAPSHOT_PATH",
+        help="fetches the general report flow groups and writes them into a binary snapshot file.",
+    )
+    parser.add_argument(
+        "--record",
+        default=None,
+        required=False,
+        metavar="CASSETTE_PATH",
+        help="records every cloud request and response into a compressed cassette file.",
+    )
+    parser.add_argument(
+        "--replay",
+        default=None,
+        required=False,
+        metavar="CASSETTE_PATH",
+        help="serves the requests from a recorded cassette file, without connecting to the cloud.",
+    )
+    parser.add_argument(
+        "--replay-latency",
+        action="store_true",
+        required=False,
+        help="when replaying a cassette, waits the recorded latency of each response.",
+    )
+    parser.add_argument(
+        "--request-timeout",
+        type=float,
+        default=None,
+        required=False,
+        metavar="SECONDS",
+        help=(
+            "deadline of each cloud request. Enables hedged read requests "
+            "and the circuit breaker as well."
+        ),
+    )
+    parser.add_argument(
+        "--report-deadline",
+        type=float,
+        default=None,
+        required=False,
+        metavar="SECONDS",
+        help="deadline of the whole execution, shared by all the cloud requests.",
+    )
+    parser.add_argument(
+        "--fallback-cassette",
+        default=None,
+        required=False,
+        metavar="CASSETTE_PATH",
+        help="recorded cassette used to serve read requests while the cloud api is degraded.",
+    )
+    parser.add_argument(
+        "--latency-stats",
+        action="store_true",
+        required=False,
+        help="prints the latency percentiles per query type at the end.",
+    )
+    parser.add_argument(
+        "--timing",
+        action="store_true",
+        required=False,
+        help="prints the elapsed time and the number of requests sent at the end.",
+    )
     parser.add_argument(
         "-p",
         "--project-filter",
@@ -67,50 +307,190 @@ def main():
     )
 
     args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
+    )
     arg_print_schedule_active = args.print_schedule_active
     arg_print_schedule_config = args.print_schedule_config
     arg_print_main_general_report = args.print_main_general_report
+    arg_print_summary = args.print_summary
+    arg_explain = args.explain
+    arg_print_flow_runs = args.print_flow_runs
+    arg_snapshot = args.snapshot
+    arg_print_capacity_forecast = args.print_capacity_forecast
+    arg_activate_schedules = args.activate_schedules
+    arg_print_schedule_inventory = args.print_schedule_inventory
+    arg_forecast_timezones = None
+    if args.forecast_timezones:
+        arg_forecast_timezones = parse_timezone_names(args.forecast_timezones)
+    arg_write_snapshot = args.write_snapshot
     arg_project_filter: list[str] = args.project_filter
 
     # validate that any of the important arguments are set.
     any_print_selected = (
         arg_print_schedule_active or
         arg_print_schedule_config or
-        arg_print_main_general_report
+        arg_print_main_general_report or
+        arg_print_summary or
+        arg_print_flow_runs or
+        arg_write_snapshot or
+        arg_print_capacity_forecast or
+        arg_activate_schedules or
+        arg_print_schedule_inventory
     )
 
     if not any_print_selected:
         exit("ERROR: no option to print was selected!")
 
-    prefect_api_key = config("PREFECT_API_KEY")
-    prefect_tenant_id = config("PREFECT_TENANT_ID")
+    if arg_activate_schedules and not arg_project_filter:
+        exit("ERROR: a project filter is required to activate schedules!")
 
-    client = PrefectCloudApiModel(
-        api_key=prefect_api_key,
-        tenant_id=prefect_tenant_id
-    )
+    if arg_forecast_timezones is not None:
+        invalid_timezones = [
+            timezone_name for timezone_name in arg_forecast_timezones if not is_valid_timezone(timezone_name)
+        ]
+        if invalid_timezones or not arg_forecast_timezones:
+            exit(f"ERROR: invalid forecast timezones: {', '.join(invalid_timezones) or args.forecast_timezones}")
 
-    if arg_print_schedule_active:
-        client.print_report_schedule_active(project_filter=arg_project_filter.pop())
-        print("")
-        print("")
+    # windowed queries depend on the current time: it is recorded on
+    # the cassette so a replay sends the same queries.
+    report_now = args.now
+    if report_now and report_now.tzinfo is None:
+        report_now = report_now.replace(tzinfo=timezone.utc)
 
-    if arg_print_schedule_config:
-        client.print_report_schedule_configurations(
-            project_filter=arg_project_filter.pop(),
-            sort_by="schedule",
+    if args.replay:
+        transport = ReplayTransport(
+            cassette_path=args.replay,
+            replay_latency=args.replay_latency,
         )
+        report_now = report_now or transport.get_recorded_now()
+    else:
+        transport = PrefectClientTransport(
+            api_key=config("PREFECT_API_KEY"),
+            tenant_id=config("PREFECT_TENANT_ID"),
+        )
+        if args.record:
+            report_now = report_now or datetime.now(timezone.utc)
+            transport = RecordingTransport(
+                transport,
+                cassette_path=args.record,
+                metadata={"now": report_now.isoformat()},
+            )
 
-    if arg_print_schedule_config:
-        client.print_report_schedule_configurations(
-            project_filter=arg_project_filter.pop(),
-            sort_by="schedule",
+    resilient_transport = None
+    use_resilient_transport = (
+        args.request_timeout or
+        args.report_deadline or
+        args.fallback_cassette or
+        args.latency_stats
+    )
+    if use_resilient_transport:
+        fallback_transport = None
+        if args.fallback_cassette:
+            fallback_transport = ReplayTransport(cassette_path=args.fallback_cassette)
+        resilient_transport = ResilientTransport(
+            transport=transport,
+            request_timeout=args.request_timeout or ResilientTransport.REQUEST_TIMEOUT,
+            fallback=fallback_transport,
         )
+        if args.report_deadline:
+            resilient_transport.start_report_deadline(args.report_deadline)
+        transport = resilient_transport
+
+    client = PrefectCloudApiModel(transport=transport)
+    start_time = time.perf_counter()
+
+    # the client is closed on errors too, so a recording is never lost
+    try:
+        if arg_print_schedule_active:
+            client.print_report_schedule_active(project_filter=arg_project_filter.pop())
+            print("")
+            print("")
+
+        if arg_print_schedule_config:
+            client.print_report_schedule_configurations(
+                project_filter=arg_project_filter.pop(),
+                sort_by="schedule",
+            )
+
+        if arg_print_schedule_config:
+            client.print_report_schedule_configurations(
+                project_filter=arg_project_filter.pop(),
+                sort_by="schedule",
+            )
+
+        if arg_write_snapshot:
+            flow_groups_written = client.write_snapshot(
+                snapshot_path=arg_write_snapshot,
+                project_filters=arg_project_filter,
+            )
+            print(f"{flow_groups_written} flow groups written into snapshot: {arg_write_snapshot}")
+
+        if arg_activate_schedules:
+            for project_filter in arg_project_filter:
+                result = client.activate_workflows_schedule_by_project(
+                    project_name=project_filter,
+                    journal_path=args.journal,
+                    batch_size=args.batch_size,
+                )
+                print(
+                    f"[{project_filter}] activated: {result['completed']} | "
+                    f"already active: {result['skipped']} | "
+                    f"resumed from journal: {result['resumed']} | "
+                    f"failed: {result['failed']}"
+                )
+
+        if arg_print_summary:
+            client.print_report_summary(project_filters=arg_project_filter)
+            print("")
+
+        if arg_print_flow_runs:
+            client.print_report_flow_runs(
+                project_filters=arg_project_filter,
+                lookback_hours=args.lookback_hours,
+                lookahead_hours=args.lookahead_hours,
+                now=report_now,
+            )
+
+        if arg_print_capacity_forecast:
+            client.print_report_capacity_forecast(
+                project_filters=arg_project_filter,
+                horizon_hours=args.horizon_hours,
+                bucket_minutes=args.bucket_minutes,
+                run_minutes=args.run_minutes,
+                agent_capacity=args.agent_capacity,
+            )
+
+        if arg_print_schedule_inventory:
+            client.print_report_schedule_inventory(
+                project_filters=arg_project_filter,
+                forecast_runs=args.forecast_runs,
+                forecast_timezones=arg_forecast_timezones,
+            )
+
+        if arg_print_main_general_report:
+            client.print_general_report(
+                project_filters=arg_project_filter,
+                sort_by="schedule",
+                explain=arg_explain,
+                snapshot_path=arg_snapshot,
+                forecast_runs=args.forecast_runs,
+                forecast_timezones=arg_forecast_timezones,
+            )
+    finally:
+        client.close()
+
+    if args.latency_stats and resilient_transport:
+        print("\n".join(resilient_transport.latency_tracker.format_percentiles()))
+        print(f"hedged requests: {resilient_transport.hedged_requests}")
 
-    if arg_print_main_general_report:
-        client.print_general_report(
-            project_filters=arg_project_filter,
-            sort_by="schedule",
+    if args.timing:
+        elapsed_time = time.perf_counter() - start_time
+        print(
+            f"elapsed: {elapsed_time:.3f} s | requests: {transport.request_count} | "
+            f"time in requests: {transport.total_latency:.3f} s"
         )
 
 
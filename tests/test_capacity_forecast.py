@@ -0,0 +1,63 @@
+from datetime import datetime, timezone
+
+from models.CapacityForecast import CapacityForecast
+from models.PrefectCloudApiModel import FlowGroupObject
+
+START = datetime(2026, 1, 15, 0, 0, tzinfo=timezone.utc)
+
+
+def get_flow_group(clock: dict, labels: list = None) -> FlowGroupObject:
+    return FlowGroupObject({
+        "id": "a",
+        "name": "a",
+        "labels": labels or [],
+        "schedule": {"clocks": [dict(clock, type="CronClock")]},
+        "flows": [{"id": "a-1", "name": "a", "version": 1, "project": {"id": "p", "name": "prod"}}],
+    })
+
+
+def compute(clock: dict, run_minutes: int, horizon_hours: int = 24):
+    forecast = CapacityForecast(
+        horizon_hours=horizon_hours, bucket_minutes=60, run_minutes=run_minutes, start=START,
+    )
+    forecast.add_flow_group(get_flow_group(clock))
+    forecast.add_flow_group(get_flow_group(clock))
+    return forecast.compute()[CapacityForecast.NO_LABELS_KEY]
+
+
+def test_runs_that_never_overlap_are_not_concurrent():
+    demand = compute({"cron": "*/5 * * * *"}, run_minutes=1)
+
+    assert demand.starts[0] == 24
+    assert demand.get_peak() == 2
+
+
+def test_runs_are_active_into_the_next_bucket():
+    demand = compute({"cron": "50 * * * *"}, run_minutes=20)
+
+    # runs started at :50 are still running at :00 to :09
+    assert demand.concurrent[:3] == [2, 2, 2]
+    assert demand.get_peak() == 2
+
+
+def test_clock_is_expanded_in_its_timezone():
+    demand = compute(
+        {"cron": "0 9 * * *", "start_date": {"dt": "2020-01-01T00:00:00", "tz": "America/Chicago"}},
+        run_minutes=1,
+    )
+
+    # 09:00 in Chicago is 15:00 UTC in winter
+    assert [bucket_index for bucket_index, starts in enumerate(demand.starts) if starts] == [15]
+
+
+def test_demand_is_clipped_to_the_clock_dates():
+    demand = compute(
+        {
+            "cron": "0 * * * *",
+            "start_date": {"dt": "2026-01-15T03:00:00", "tz": "UTC"},
+            "end_date": {"dt": "2026-01-15T05:00:00", "tz": "UTC"},
+        },
+        run_minutes=1,
+    )
+
+    assert [bucket_index for bucket_index, starts in enumerate(demand.starts) if starts] == [3, 4, 5]
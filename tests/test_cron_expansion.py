@@ -0,0 +1,133 @@
+import random
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from models.CronExpansion import get_cron_expansion
+
+croniter = pytest.importorskip("croniter").croniter
+
+START = datetime(2026, 1, 29, 22, 47, tzinfo=timezone.utc)
+FIRE_TIMES = 12
+
+MINUTE_FIELDS = ["0", "*/15", "5,35", "10-12", "*/20"]
+HOUR_FIELDS = ["*", "0", "*/6", "9-17", "2,14"]
+DAY_FIELDS = ["*", "1", "1-31", "*/2", "15", "1,15", "10-20", "29", "31"]
+MONTH_FIELDS = ["*", "*/3", "2", "1-6"]
+WEEKDAY_FIELDS = ["*", "1", "0-6", "*/2", "1-5", "0,6", "3"]
+
+
+def generate_expressions(count: int, seed: int = 35):
+    generator = random.Random(seed)
+    expressions = set()
+    while len(expressions) < count:
+        fields = [
+            generator.choice(fields)
+            for fields in (MINUTE_FIELDS, HOUR_FIELDS, DAY_FIELDS, MONTH_FIELDS, WEEKDAY_FIELDS)
+        ]
+        # croniter rejects days missing from the month (e.g. 31 2) before
+        # applying the day rule: such clocks are never scheduled
+        if fields[2] == "31" and fields[3] == "2":
+            continue
+        expressions.add(" ".join(fields))
+    return sorted(expressions)
+
+
+@pytest.mark.parametrize("cron_value", generate_expressions(160))
+def test_next_fire_times_match_croniter(cron_value):
+    expected_iterator = croniter(cron_value, START)
+    expected = [expected_iterator.get_next(datetime) for _ in range(FIRE_TIMES)]
+
+    assert get_cron_expansion(cron_value).get_next_fire_times(START, FIRE_TIMES) == expected
+
+
+@pytest.mark.parametrize("cron_value", ["0 0 1 * 1", "0 0 1-31 * 1", "0 0 * * 1", "0 0 1-31 * */2"])
+def test_day_rule_matches_croniter(cron_value):
+    expected_iterator = croniter(cron_value, START)
+    expected = [expected_iterator.get_next(datetime) for _ in range(FIRE_TIMES)]
+
+    assert get_cron_expansion(cron_value).get_next_fire_times(START, FIRE_TIMES) == expected
+
+
+@pytest.mark.parametrize("cron_value", generate_expressions(40, seed=28))
+def test_next_fire_times_in_zone_match_croniter(cron_value):
+    # half hour offset and no DST: local days differ from the UTC ones
+    zone = ZoneInfo("Asia/Kolkata")
+    expected_iterator = croniter(cron_value, START.astimezone(zone))
+    expected = [expected_iterator.get_next(datetime).astimezone(timezone.utc) for _ in range(FIRE_TIMES)]
+
+    assert get_cron_expansion(cron_value).get_next_fire_times(START, FIRE_TIMES, zone) == expected
+
+
+def test_dst_skipped_time_fires_after_the_jump():
+    zone = ZoneInfo("America/Chicago")
+    start = datetime(2026, 3, 7, 12, 0, tzinfo=timezone.utc)
+
+    fire_times = get_cron_expansion("30 2 * * *").get_next_fire_times(start, 3, zone)
+
+    assert fire_times == [
+        datetime(2026, 3, 8, 8, 30, tzinfo=timezone.utc),
+        datetime(2026, 3, 9, 7, 30, tzinfo=timezone.utc),
+        datetime(2026, 3, 10, 7, 30, tzinfo=timezone.utc),
+    ]
+
+
+def test_dst_skipped_and_existing_times_fire_once():
+    zone = ZoneInfo("America/Chicago")
+    start = datetime(2026, 3, 8, 7, 0, tzinfo=timezone.utc)
+
+    # 02:30 does not exist on that day, it fires with 03:30
+    fire_times = get_cron_expansion("30 2,3 8 3 *").iter_fire_times_in_zone(start, start + timedelta(days=1), zone)
+
+    assert list(fire_times) == [datetime(2026, 3, 8, 8, 30, tzinfo=timezone.utc)]
+
+
+def test_dst_repeated_time_fires_once():
+    zone = ZoneInfo("America/Chicago")
+    start = datetime(2026, 10, 31, 12, 0, tzinfo=timezone.utc)
+
+    fire_times = get_cron_expansion("30 1 * * *").get_next_fire_times(start, 3, zone)
+
+    assert fire_times == [
+        datetime(2026, 11, 1, 6, 30, tzinfo=timezone.utc),
+        datetime(2026, 11, 2, 7, 30, tzinfo=timezone.utc),
+        datetime(2026, 11, 3, 7, 30, tzinfo=timezone.utc),
+    ]
+
+
+def test_next_fire_times_within_start_and_end_dates():
+    cron_expansion = get_cron_expansion("0 9 * * *")
+    start_date = datetime(2026, 2, 3, 9, 0, tzinfo=timezone.utc)
+    end_date = datetime(2026, 2, 5, 9, 0, tzinfo=timezone.utc)
+
+    fire_times = cron_expansion.get_next_fire_times(START, 5, start_date=start_date, end_date=end_date)
+
+    assert fire_times == [start_date, start_date + timedelta(days=1), end_date]
+
+
+def test_count_per_bucket_in_zone():
+    zone = ZoneInfo("America/Chicago")
+    end = START + timedelta(days=2)
+
+    counts = get_cron_expansion("0 9 * * *").count_per_bucket(START, end, 60, zone)
+
+    # 09:00 in Chicago is 15:00 UTC in winter
+    assert [index for index, count in enumerate(counts) if count] == [16, 40]
+
+
+def test_equivalent_expressions_share_canonical_key():
+    every_two_hours = get_cron_expansion("0 */2 * * *")
+    listed_hours = get_cron_expansion("0 0,2,4,6,8,10,12,14,16,18,20,22 * * *")
+
+    assert every_two_hours.canonical_key == listed_hours.canonical_key
+    assert every_two_hours.canonical_value == listed_hours.canonical_value
+
+
+def test_count_per_bucket_matches_fire_times():
+    cron_expansion = get_cron_expansion("*/20 9-17 * * 1-5")
+    end = START.replace(day=START.day + 2)
+
+    counts = cron_expansion.count_per_bucket(START, end, 60)
+
+    assert sum(counts) == len(list(cron_expansion.iter_fire_times(START, end)))
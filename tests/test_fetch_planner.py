@@ -0,0 +1,66 @@
+import pytest
+
+from models.FetchPlanner import FetchPlan, FetchPlanner
+
+# with these limits a flow group weighs 640 bytes and each flow version 230
+MAX_QUERY_BYTES = 5000
+MAX_WORKERS = 4
+
+SMALL_PROJECT = {"flow_groups": 2, "flows": 4, "schedule_active": 1}
+LARGE_PROJECT = {"flow_groups": 10, "flows": 40, "schedule_active": 2}
+SHARD_PROJECT = {"flow_groups": 4, "flows": 4}
+
+
+@pytest.mark.parametrize(
+    "summary, kwargs, strategy, latest_only, page_size, max_workers",
+    [
+        # 2 * 640 + 4 * 230 fits into a single query
+        ({"a": SMALL_PROJECT}, {}, FetchPlan.STRATEGY_SINGLE, False, None, 1),
+        ({"a": SMALL_PROJECT}, {"only_latest": True}, FetchPlan.STRATEGY_LATEST_ONLY, True, None, 1),
+        # every version: pages of 5000 // (640 + 4 * 230) flow groups
+        ({"a": LARGE_PROJECT}, {}, FetchPlan.STRATEGY_PAGINATED, False, 3, 4),
+        # latest version only: pages of 5000 // (640 + 230) flow groups
+        ({"a": LARGE_PROJECT}, {"only_latest": True}, FetchPlan.STRATEGY_PAGINATED, True, 5, 2),
+        # every shard fits into a single query
+        ({"a": SHARD_PROJECT, "b": SHARD_PROJECT}, {}, FetchPlan.STRATEGY_SHARDED, False, None, 2),
+        # the largest shard does not fit: shards are paginated too
+        ({"a": LARGE_PROJECT, "b": SMALL_PROJECT}, {}, FetchPlan.STRATEGY_SHARDED, False, 3, 4),
+        ({"a": LARGE_PROJECT, "b": SMALL_PROJECT}, {"only_latest": True}, FetchPlan.STRATEGY_SHARDED, True, 5, 3),
+        # schedule-only plans are estimated from the schedule-active counts
+        ({"a": LARGE_PROJECT}, {"schedule_only": True}, FetchPlan.STRATEGY_SINGLE, False, None, 1),
+        ({}, {}, FetchPlan.STRATEGY_SINGLE, False, None, 1),
+        ({}, {"only_latest": True}, FetchPlan.STRATEGY_LATEST_ONLY, True, None, 1),
+    ],
+)
+def test_plan_strategy(summary, kwargs, strategy, latest_only, page_size, max_workers):
+    fetch_plan = FetchPlanner(MAX_QUERY_BYTES, MAX_WORKERS).plan(summary, ["prod"], **kwargs)
+
+    assert fetch_plan.strategy == strategy
+    assert fetch_plan.latest_only == latest_only
+    assert fetch_plan.page_size == page_size
+    assert fetch_plan.max_workers == max_workers
+    assert fetch_plan.project_filters == ["prod"]
+    assert fetch_plan.project_names == list(summary)
+
+
+def test_plan_counts_and_estimation():
+    planner = FetchPlanner(MAX_QUERY_BYTES, MAX_WORKERS)
+
+    fetch_plan = planner.plan({"a": LARGE_PROJECT, "b": SMALL_PROJECT})
+    schedule_plan = planner.plan({"a": LARGE_PROJECT, "b": SMALL_PROJECT}, schedule_only=True)
+
+    assert (fetch_plan.flow_group_count, fetch_plan.flow_count) == (12, 44)
+    assert fetch_plan.estimated_bytes == planner.estimate_bytes(12, 44)
+    assert fetch_plan.project_counts == {"a": 10, "b": 2}
+    # schedule-active flow groups hold the average versions of their project
+    assert (schedule_plan.flow_group_count, schedule_plan.flow_count) == (3, 10)
+    assert schedule_plan.project_counts == {"a": 2, "b": 1}
+    assert fetch_plan.project_filters == []
+
+
+def test_per_project_plans():
+    planner = FetchPlanner(MAX_QUERY_BYTES, MAX_WORKERS)
+
+    assert planner.plan({"a": LARGE_PROJECT}).is_per_project()
+    assert not planner.plan({"a": SMALL_PROJECT}).is_per_project()
+    assert not planner.plan({"a": SMALL_PROJECT}, only_latest=True).is_per_project()
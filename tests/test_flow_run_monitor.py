@@ -0,0 +1,69 @@
+from datetime import datetime, timezone
+
+from models.FlowRunMonitor import FlowRunMonitor
+from models.PrefectCloudApiModel import FlowGroupObject
+
+NOW = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def get_flow_group(clock: dict) -> FlowGroupObject:
+    return FlowGroupObject({
+        "id": "a",
+        "name": "a",
+        "schedule": {"clocks": [dict(clock, type="CronClock")]},
+        "flows": [{"id": "a-1", "name": "a", "version": 1, "project": {"id": "p", "name": "prod"}}],
+    })
+
+
+def get_flow_run(scheduled_start_time: str, state: str = "Success") -> dict:
+    return {"scheduled_start_time": scheduled_start_time, "state": state}
+
+
+def test_missing_and_late_runs():
+    monitor = FlowRunMonitor(lookback_hours=5, now=NOW)
+    flow_runs = [
+        get_flow_run("2026-03-01T08:00:00+00:00"),
+        get_flow_run("2026-03-01T10:00:00+00:00", state="Scheduled"),
+        get_flow_run("2026-03-01T13:00:00+00:00", state="Scheduled"),
+    ]
+
+    status = monitor.evaluate(get_flow_group({"cron": "0 * * * *"}), flow_runs)
+
+    # expected at 07:00 to 11:00, runs only seen at 08:00 and 10:00
+    assert status.missing_runs == 3
+    assert status.late_runs == 1
+    assert status.upcoming_runs == 1
+
+
+def test_clock_is_checked_in_its_timezone():
+    monitor = FlowRunMonitor(lookback_hours=24, now=NOW)
+    clock = {"cron": "0 9 * * *", "start_date": {"dt": "2020-01-01T00:00:00", "tz": "America/Chicago"}}
+
+    # 09:00 in Chicago is 15:00 UTC in winter
+    status = monitor.evaluate(get_flow_group(clock), [get_flow_run("2026-02-28T15:00:00+00:00")])
+
+    assert status.missing_runs == 0
+    assert status.unchecked_clocks == 0
+
+
+def test_expected_runs_are_bounded_by_the_clock_dates():
+    monitor = FlowRunMonitor(lookback_hours=5, now=NOW)
+    clock = {
+        "cron": "0 * * * *",
+        "start_date": {"dt": "2026-03-01T08:00:00", "tz": "UTC"},
+        "end_date": {"dt": "2026-03-01T09:00:00", "tz": "UTC"},
+    }
+
+    status = monitor.evaluate(get_flow_group(clock), [])
+
+    assert status.missing_runs == 2
+
+
+def test_clock_in_unknown_timezone_is_not_checked():
+    monitor = FlowRunMonitor(lookback_hours=5, now=NOW)
+    clock = {"cron": "0 * * * *", "start_date": {"dt": "2020-01-01T00:00:00", "tz": "Mars/Olympus"}}
+
+    status = monitor.evaluate(get_flow_group(clock), [])
+
+    assert status.missing_runs == 0
+    assert status.unchecked_clocks == 1
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from models.FlowRunMonitor import FlowRunMonitor
+from models.GraphQlTransport import CassetteMissError, GraphQlTransport, RecordingTransport, ReplayTransport
+from models.PrefectCloudApiModel import FlowGroupObject, PrefectCloudApiModel
+
+NOW = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+class CountingTransport(GraphQlTransport):
+    """Answers each query with the number of times it was sent."""
+
+    def __init__(self):
+        super().__init__()
+        self.counts = {}
+
+    def _execute(self, query, variables=None):
+        query = self.normalize_query(query)
+        self.counts[query] = self.counts.get(query, 0) + 1
+        return {"data": {"query": query, "count": self.counts[query]}}
+
+
+class FlowRunTransport(GraphQlTransport):
+    """Answers flow run queries with a single successful run of flow a-1."""
+
+    def _execute(self, query, variables=None):
+        return {"data": {"flow_run": [{
+            "id": "run-1", "flow_id": "a-1", "state": "Success",
+            "scheduled_start_time": "2026-03-01T11:00:00+00:00",
+        }]}}
+
+
+def record(cassette_path, transport, queries, metadata=None):
+    recording_transport = RecordingTransport(transport, cassette_path, metadata=metadata)
+    responses = [recording_transport.execute(query) for query in queries]
+    recording_transport.close()
+    return responses
+
+
+def test_replay_serves_the_recorded_responses_in_order(tmp_path):
+    cassette_path = str(tmp_path / "run.cassette")
+    queries = ["{ project { name } }", "{ flow { id } }", "{  project {\n name } }"]
+    recorded = record(cassette_path, CountingTransport(), queries)
+
+    replay_transport = ReplayTransport(cassette_path)
+    replayed = [replay_transport.execute(query) for query in queries]
+
+    assert replayed == recorded
+    # the same normalized query was recorded twice, served in order
+    assert [response["data"]["count"] for response in replayed] == [1, 1, 2]
+    # once all were served, the last response is repeated
+    assert replay_transport.execute("{ project { name } }")["data"]["count"] == 2
+    assert replay_transport.request_count == 4
+
+
+def test_replay_raises_on_unrecorded_query(tmp_path):
+    cassette_path = str(tmp_path / "run.cassette")
+    record(cassette_path, CountingTransport(), ["{ project { name } }"])
+
+    with pytest.raises(CassetteMissError):
+        ReplayTransport(cassette_path).execute("{ flow { id } }")
+
+
+def test_replay_reuses_the_recorded_now(tmp_path):
+    cassette_path = str(tmp_path / "run.cassette")
+    flow_group = FlowGroupObject({
+        "id": "a",
+        "name": "a",
+        "schedule": {"clocks": [{"type": "CronClock", "cron": "0 * * * *"}]},
+        "flows": [{
+            "id": "a-1", "name": "a", "version": 1, "is_schedule_active": True,
+            "project": {"id": "p", "name": "prod"},
+        }],
+    })
+
+    def get_statuses(transport, now):
+        client = PrefectCloudApiModel(transport=transport)
+        client.iter_flow_groups = lambda *args, **kwargs: iter([flow_group])
+        statuses = list(client.iter_flow_run_statuses(monitor=FlowRunMonitor(lookback_hours=5, now=now)))
+        client.close()
+        return [(status.flow_group_id, status.missing_runs) for status in statuses]
+
+    recorded = get_statuses(
+        RecordingTransport(FlowRunTransport(), cassette_path, metadata={"now": NOW.isoformat()}), NOW
+    )
+
+    replay_transport = ReplayTransport(cassette_path)
+    assert replay_transport.get_recorded_now() == NOW
+    assert get_statuses(replay_transport, replay_transport.get_recorded_now()) == recorded == [("a", 4)]
+    # windowed queries computed for another time were not recorded
+    with pytest.raises(CassetteMissError):
+        get_statuses(ReplayTransport(cassette_path), NOW + timedelta(hours=1))
@@ -0,0 +1,94 @@
+import threading
+import time
+
+import pytest
+
+from models.GraphQlTransport import GraphQlTransport
+from models.LatencyControl import (
+    CircuitBreaker,
+    CircuitOpenError,
+    QueryDeadlineExceeded,
+    ReportDeadlineExceeded,
+    ResilientTransport,
+)
+
+QUERY = "{ flow_group { id } }"
+
+
+class SlowTransport(GraphQlTransport):
+    """Answers after ``delay`` seconds, or raises ``error`` when set."""
+
+    def __init__(self, delay: float = 0.0, error: Exception = None):
+        super().__init__()
+        self.delay = delay
+        self.error = error
+        self.release = threading.Event()
+
+    def _execute(self, query, variables=None):
+        self.release.wait(self.delay)
+        if self.error:
+            raise self.error
+        return {"data": {"flow_group": []}}
+
+
+def get_transport(transport: GraphQlTransport, **kwargs) -> ResilientTransport:
+    # the circuit opens on the first failure
+    return ResilientTransport(transport, hedge=False, circuit_breaker=CircuitBreaker(failure_threshold=1), **kwargs)
+
+
+def test_report_deadline_expiry_does_not_open_the_circuit():
+    slow_transport = SlowTransport(delay=5)
+    transport = get_transport(slow_transport, request_timeout=10)
+    transport.start_report_deadline(0.05)
+
+    with pytest.raises(ReportDeadlineExceeded):
+        transport.execute(QUERY)
+    with pytest.raises(ReportDeadlineExceeded):
+        transport.execute(QUERY)
+
+    assert transport.circuit_breaker.state == CircuitBreaker.STATE_CLOSED
+    slow_transport.release.set()
+    transport.close()
+
+
+def test_request_timeout_opens_the_circuit():
+    slow_transport = SlowTransport(delay=5)
+    transport = get_transport(slow_transport, request_timeout=0.05)
+
+    with pytest.raises(QueryDeadlineExceeded) as error_info:
+        transport.execute(QUERY)
+    assert not isinstance(error_info.value, ReportDeadlineExceeded)
+    assert transport.circuit_breaker.state == CircuitBreaker.STATE_OPEN
+    with pytest.raises(CircuitOpenError):
+        transport.execute(QUERY)
+
+    slow_transport.release.set()
+    transport.close()
+
+
+def test_transport_error_opens_the_circuit():
+    transport = get_transport(SlowTransport(error=ConnectionError("connection reset")), request_timeout=10)
+    transport.start_report_deadline(5)
+
+    with pytest.raises(ConnectionError):
+        transport.execute(QUERY)
+
+    assert transport.circuit_breaker.state == CircuitBreaker.STATE_OPEN
+    transport.close()
+
+
+def test_hedged_requests_are_counted_across_threads():
+    transport = ResilientTransport(SlowTransport(), request_timeout=10)
+    for _ in range(ResilientTransport.HEDGE_MIN_SAMPLES):
+        transport.execute(QUERY)
+    # every request now outlives the p95 latency of the query type
+    transport.transport.delay = 0.05
+
+    threads = [threading.Thread(target=transport.execute, args=(QUERY,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert transport.hedged_requests == 8
+    transport.close()
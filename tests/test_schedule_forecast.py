@@ -0,0 +1,49 @@
+from datetime import datetime, timezone
+
+from models.PrefectCloudApiModel import ScheduleClock
+from models.ScheduleForecast import ScheduleForecast
+
+NOW = datetime(2026, 3, 6, 12, 0, tzinfo=timezone.utc)
+
+
+def get_clock(cron_value: str, start_date=None, end_date=None) -> ScheduleClock:
+    return ScheduleClock({
+        "type": "CronClock",
+        "cron": cron_value,
+        "start_date": start_date,
+        "end_date": end_date,
+    })
+
+
+def test_clock_is_forecast_in_the_timezone_of_its_start_date():
+    clock = get_clock("0 9 * * *", start_date={"dt": "2020-01-01T00:00:00", "tz": "America/Chicago"})
+    forecast = ScheduleForecast(["UTC", "America/Chicago"], runs=3, now=NOW)
+
+    next_runs = forecast.get_next_runs([clock])
+
+    # Chicago moves to daylight saving time on 2026-03-08
+    assert next_runs["UTC"] == [
+        datetime(2026, 3, 6, 15, 0, tzinfo=timezone.utc),
+        datetime(2026, 3, 7, 15, 0, tzinfo=timezone.utc),
+        datetime(2026, 3, 8, 14, 0, tzinfo=timezone.utc),
+    ]
+    assert [next_run.hour for next_run in next_runs["America/Chicago"]] == [9, 9, 9]
+
+
+def test_same_expression_in_other_timezones_is_not_shared():
+    utc_clock = get_clock("0 9 * * *")
+    chicago_clock = get_clock("0 9 * * *", start_date={"dt": "2020-01-01T00:00:00", "tz": "America/Chicago"})
+    forecast = ScheduleForecast(["UTC"], runs=1, now=NOW)
+    forecast.add_clocks([utc_clock, chicago_clock])
+
+    assert forecast.get_next_runs_utc([utc_clock]) == [datetime(2026, 3, 7, 9, 0, tzinfo=timezone.utc)]
+    assert forecast.get_next_runs_utc([chicago_clock]) == [datetime(2026, 3, 6, 15, 0, tzinfo=timezone.utc)]
+
+
+def test_forecast_is_bounded_by_the_clock_dates():
+    future_clock = get_clock("0 9 * * *", start_date={"dt": "2026-04-01T00:00:00", "tz": "UTC"})
+    expired_clock = get_clock("0 9 * * *", end_date={"dt": "2026-03-01T00:00:00", "tz": "UTC"})
+    forecast = ScheduleForecast(["UTC"], runs=1, now=NOW)
+
+    assert forecast.get_next_runs_utc([future_clock]) == [datetime(2026, 4, 1, 9, 0, tzinfo=timezone.utc)]
+    assert forecast.get_next_runs_utc([expired_clock]) == []
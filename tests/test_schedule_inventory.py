@@ -0,0 +1,48 @@
+from models.PrefectCloudApiModel import FlowGroupObject
+from models.ScheduleInventory import ScheduleInventory
+
+CHICAGO_START_DATE = {"dt": "2020-01-01T00:00:00", "tz": "America/Chicago"}
+
+
+def get_flow_group(flow_group_id: str, clocks: list) -> FlowGroupObject:
+    return FlowGroupObject({
+        "id": flow_group_id,
+        "name": flow_group_id,
+        "schedule": {"clocks": clocks},
+        "flows": [{
+            "id": f"{flow_group_id}-1", "name": flow_group_id, "version": 1, "is_schedule_active": True,
+            "project": {"id": "p", "name": "prod"},
+        }],
+    })
+
+
+def test_equivalent_expressions_are_grouped():
+    inventory = ScheduleInventory()
+    inventory.add_flow_group(get_flow_group("a", [{"type": "CronClock", "cron": "0 */2 * * *"}]))
+    inventory.add_flow_group(get_flow_group("b", [{"type": "CronClock", "cron": "0 0-22/2 * * *"}]))
+
+    schedules = inventory.get_schedules()
+
+    assert len(schedules) == 1
+    assert schedules[0].get_count() == 2
+    assert schedules[0].active_count == 2
+    assert schedules[0].expressions == {"0 */2 * * *", "0 0-22/2 * * *"}
+
+
+def test_same_expression_in_other_timezones_is_not_grouped():
+    inventory = ScheduleInventory()
+    inventory.add_flow_group(get_flow_group("a", [{"type": "CronClock", "cron": "0 9 * * *"}]))
+    inventory.add_flow_group(get_flow_group("b", [
+        {"type": "CronClock", "cron": "0 9 * * *", "start_date": {"dt": "2020-01-01T00:00:00", "tz": "Etc/UTC"}},
+    ]))
+    inventory.add_flow_group(get_flow_group("c", [
+        {"type": "CronClock", "cron": "0 9 * * *", "start_date": CHICAGO_START_DATE},
+    ]))
+
+    schedules = inventory.get_schedules()
+
+    assert [schedule.get_schedule_str() for schedule in schedules] == [
+        "0 9 * * * (UTC)",
+        "0 9 * * * (America/Chicago)",
+    ]
+    assert [schedule.get_count() for schedule in schedules] == [2, 1]
@@ -0,0 +1,104 @@
+import json
+import re
+
+import pytest
+
+from models.GraphQlTransport import GraphQlTransport
+from models.PrefectCloudApiModel import PrefectCloudApiModel
+from models.ScheduleJournal import ScheduleJournal, ScheduleOperation
+
+
+class MutationTransport(GraphQlTransport):
+    """Answers batched mutations, failing the targets and requests it is told to."""
+
+    def __init__(self, failing_targets=(), failing_requests=()):
+        super().__init__()
+        self.failing_targets = set(failing_targets)
+        self.failing_requests = set(failing_requests)
+        self.sent_targets = []  # list of the flow ids sent on each request
+
+    def _execute(self, query, variables=None):
+        targets = re.findall(r'flow_id: "([^"]+)"', query)
+        self.sent_targets.append(targets)
+        if len(self.sent_targets) in self.failing_requests:
+            raise ConnectionError("connection reset")
+        return {"data": {
+            f"m{index}": {"success": target not in self.failing_targets}
+            for index, target in enumerate(targets)
+        }}
+
+
+def get_operations(*target_ids):
+    return [ScheduleOperation(ScheduleOperation.KIND_ACTIVATE, target_id) for target_id in target_ids]
+
+
+def read_events(journal_path):
+    with open(journal_path, encoding="utf-8") as journal_file:
+        return [(entry["event"], entry["target_id"]) for entry in map(json.loads, journal_file)]
+
+
+def test_operations_are_sent_in_batches(tmp_path):
+    transport = MutationTransport(failing_targets={"c"})
+    client = PrefectCloudApiModel(transport=transport)
+
+    result = client.apply_schedule_operations(
+        get_operations("a", "b", "c", "d", "e"), journal_path=str(tmp_path / "ops.journal"), batch_size=2,
+    )
+
+    assert transport.sent_targets == [["a", "b"], ["c", "d"], ["e"]]
+    assert result == {"completed": 4, "skipped": 0, "failed": 1, "resumed": 0}
+
+
+def test_rerun_resumes_after_a_failed_batch(tmp_path):
+    journal_path = str(tmp_path / "ops.journal")
+    operations = get_operations("a", "b", "c", "d")
+
+    failing_client = PrefectCloudApiModel(transport=MutationTransport(failing_requests={2}))
+    with pytest.raises(ConnectionError):
+        failing_client.apply_schedule_operations(operations, journal_path=journal_path, batch_size=2)
+
+    transport = MutationTransport()
+    result = PrefectCloudApiModel(transport=transport).apply_schedule_operations(
+        operations, journal_path=journal_path, batch_size=2,
+    )
+
+    assert transport.sent_targets == [["c", "d"]]
+    assert result["resumed"] == 2
+    assert result["completed"] == 2
+
+
+def test_skipped_operations_are_journaled_and_not_sent(tmp_path):
+    journal_path = str(tmp_path / "ops.journal")
+    transport = MutationTransport()
+
+    result = PrefectCloudApiModel(transport=transport).apply_schedule_operations(
+        get_operations("a"), skipped_operations=get_operations("b"), journal_path=journal_path,
+    )
+
+    assert transport.sent_targets == [["a"]]
+    assert result["skipped"] == 1
+    assert ("skipped", "b") in read_events(journal_path)
+    journal = ScheduleJournal(journal_path)
+    assert journal.is_done(get_operations("b")[0])
+    journal.close()
+
+
+def test_truncated_last_line_does_not_swallow_the_next_entry(tmp_path):
+    journal_path = str(tmp_path / "ops.journal")
+    operation_a, operation_b = get_operations("a", "b")
+    journal = ScheduleJournal(journal_path)
+    journal.record(ScheduleJournal.EVENT_COMPLETED, [operation_a])
+    journal.close()
+    # crash while writing the next entry
+    with open(journal_path, "a", encoding="utf-8") as journal_file:
+        journal_file.write('{"key": "activate:x:", "event": "compl')
+
+    journal = ScheduleJournal(journal_path)
+    journal.record(ScheduleJournal.EVENT_COMPLETED, [operation_b])
+    journal.close()
+
+    reloaded_journal = ScheduleJournal(journal_path)
+    assert reloaded_journal.is_done(operation_a)
+    assert reloaded_journal.is_done(operation_b)
+    assert not reloaded_journal.is_done(get_operations("x")[0])
+    reloaded_journal.close()
@@ -0,0 +1,106 @@
+import pytest
+
+from models.PrefectCloudApiModel import FlowGroupObject
+from models.TenantSnapshot import SnapshotVersionError, TenantSnapshot
+
+QUERY_SHAPE = "{ flow_group { name id labels schedule flows { id name version } } }"
+
+FLOW_GROUPS = [
+    {
+        "name": "group-a",
+        "id": "a",
+        "labels": ["k8s", "prod"],
+        "schedule": {
+            "clocks": [
+                {"type": "CronClock", "cron": "0 */2 * * *"},
+                {"type": "CronClock", "cron": "30 6 * * 1-5", "parameter_defaults": {"full": True}},
+                {
+                    "type": "CronClock",
+                    "cron": "0 9 * * *",
+                    "start_date": {"dt": "2020-01-01T00:00:00", "tz": "America/Chicago"},
+                    "end_date": {"dt": "2030-01-01T00:00:00", "tz": "America/Chicago"},
+                },
+                {"type": "IntervalClock", "interval": 3600000000, "start_date": None},
+            ],
+        },
+        "flows": [
+            {
+                "id": "a-1", "name": "flow-a", "version": 1, "is_schedule_active": False,
+                "project": {"id": "p1", "name": "prod-a"},
+            },
+            {
+                "id": "a-2", "name": "flow-a", "version": 2, "is_schedule_active": True,
+                "project": {"id": "p1", "name": "prod-a"},
+            },
+        ],
+    },
+    {
+        "name": "group-b",
+        "id": "b",
+        "labels": [],
+        "schedule": None,
+        "flows": [
+            {
+                "id": "b-1", "name": "flów-b", "version": 7, "is_schedule_active": False,
+                "project": {"id": "p2", "name": "dev"},
+            },
+        ],
+    },
+]
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    path = str(tmp_path / "tenant.snapshot")
+    TenantSnapshot.write(path, iter(FLOW_GROUPS), QUERY_SHAPE, project_filters=["prod", "dev"], latest_only=True)
+    return path
+
+
+def test_round_trip(snapshot_path):
+    with TenantSnapshot(snapshot_path, QUERY_SHAPE) as snapshot:
+        flow_groups = list(snapshot.iter_raw())
+
+    assert len(flow_groups) == 2
+    group_a, group_b = flow_groups
+    # flows are written latest version first, as the reports read them
+    assert [flow["id"] for flow in group_a["flows"]] == ["a-2", "a-1"]
+    assert group_a["flows"][0] == FLOW_GROUPS[0]["flows"][1]
+    assert group_a["labels"] == ["k8s", "prod"]
+    assert group_a["schedule"] == FLOW_GROUPS[0]["schedule"]
+    assert group_b == FLOW_GROUPS[1]
+
+
+def test_round_trip_keeps_the_clock_timezone(snapshot_path):
+    with TenantSnapshot(snapshot_path, QUERY_SHAPE) as snapshot:
+        flow_group = FlowGroupObject(snapshot.get_raw(0))
+
+    dated_clock = flow_group.schedules[2]
+    assert dated_clock.timezone == "America/Chicago"
+    assert dated_clock.start_date.isoformat() == "2020-01-01T00:00:00-06:00"
+    assert dated_clock.end_date.year == 2030
+
+
+def test_metadata_and_project_names(snapshot_path):
+    with TenantSnapshot(snapshot_path, QUERY_SHAPE) as snapshot:
+        assert len(snapshot) == 2
+        assert snapshot.project_filters == ["prod", "dev"]
+        assert snapshot.latest_only
+        assert [snapshot.get_project_name(index) for index in range(len(snapshot))] == ["prod-a", "dev"]
+        assert snapshot.covers(["prod-a", "dev"])
+        assert not snapshot.covers(["staging"])
+        assert not snapshot.covers(None)
+        with pytest.raises(IndexError):
+            snapshot.get_raw(2)
+
+
+def test_other_query_shape_is_rejected(snapshot_path):
+    with pytest.raises(SnapshotVersionError):
+        TenantSnapshot(snapshot_path, QUERY_SHAPE.replace("labels ", ""))
+
+
+def test_empty_file_is_rejected(tmp_path):
+    path = tmp_path / "empty.snapshot"
+    path.write_bytes(b"")
+
+    with pytest.raises(SnapshotVersionError):
+        TenantSnapshot(str(path), QUERY_SHAPE)